@@ -0,0 +1,44 @@
+"""A1 notation helpers with the same behaviour as gspread.utils.
+
+Importing gspread.utils loads the whole gspread package (auth, requests,
+google-auth), which is most of a cold start, so the hot paths use these.
+"""
+import re
+from typing import Any, List, Optional, Tuple
+
+_CELL_RE = re.compile(r"([A-Za-z]+)([1-9]\d*)")
+
+def a1_to_rowcol(label: str) -> Tuple[int, int]:
+    """'B3' -> (3, 2), both 1-based."""
+    match = _CELL_RE.match(label)
+    if not match:
+        raise ValueError(f"Invalid cell label: {label}")
+    col = 0
+    for letter in match.group(1).upper():
+        col = col * 26 + ord(letter) - 64
+    return int(match.group(2)), col
+
+def rowcol_to_a1(row: int, col: int) -> str:
+    """(3, 2) -> 'B3'."""
+    if row < 1 or col < 1:
+        raise ValueError(f"Invalid cell: ({row}, {col})")
+    label = ""
+    while col:
+        col, mod = divmod(col - 1, 26)
+        label = chr(mod + 65) + label
+    return f"{label}{row}"
+
+def absolute_range_name(sheet_name: str, range_name: Optional[str] = None) -> str:
+    """Quote a sheet name and prefix it to a range: ("Open", "A1") -> "'Open'!A1"."""
+    sheet_name = "'{}'".format(sheet_name.replace("'", "''"))
+    return f"{sheet_name}!{range_name}" if range_name else sheet_name
+
+def fill_gaps(values: List[List[Any]], rows: Optional[int] = None, cols: Optional[int] = None,
+              padding_value: Any = "") -> List[List[Any]]:
+    """Pad ragged rows (and missing rows) to a rectangle, as get_all_values returns it."""
+    if not values and cols is None:
+        return [[]]
+    cols = max(len(row) for row in values) if cols is None else cols
+    rows = len(values) if rows is None else rows
+    values = values + [[]] * (rows - len(values))
+    return [row + [padding_value] * (cols - len(row)) if len(row) < cols else row for row in values]
@@ -0,0 +1,227 @@
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from a1 import a1_to_rowcol, fill_gaps
+from metrics import REGISTRY
+
+SPREADSHEET_NAME = "Relay Data"
+_RANGE_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+class QuotaExceededError(Exception):
+    """Raised by the local backend to simulate a Sheets 429 response."""
+    code = 429
+
+def split_range(range_name: str) -> Tuple[str, str]:
+    """Split "'Open'!E3:H10" into ("Open", "E3:H10")."""
+    if "!" not in range_name:
+        return range_name.strip("'"), ""
+    sheet, cells = range_name.rsplit("!", 1)
+    if sheet.startswith("'") and sheet.endswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, cells
+
+def range_bounds(cells: str) -> Tuple[int, int, Optional[int], Optional[int]]:
+    """1-based (first_row, first_col, last_row, last_col) of an A1 range; None means unbounded."""
+    if not cells:
+        return 1, 1, None, None
+    start, _, end = cells.upper().partition(":")
+    start_col, start_row = _RANGE_RE.match(start).groups()
+    end_col, end_row = _RANGE_RE.match(end or start).groups()
+    first_col = a1_to_rowcol(f"{start_col or 'A'}1")[1]
+    last_col = a1_to_rowcol(f"{end_col}1")[1] if end_col else None
+    return int(start_row or 1), first_col, int(end_row) if end_row else None, last_col
+
+class SheetBackend(ABC):
+    """What the manager and server need from a spreadsheet, plus per-call latency."""
+
+    def __init__(self):
+        self.latency: Dict[str, Dict[str, float]] = {}
+        self._latency_lock = threading.Lock()
+
+    def _timed(self, op: str, func, *args, **kwargs):
+        start = time.perf_counter()
+        REGISTRY.inc("mor_sheets_api_requests_total", op=op)
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            REGISTRY.inc("mor_sheets_api_errors_total", op=op)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            REGISTRY.observe("mor_sheets_api_seconds", elapsed, op=op)
+            with self._latency_lock:
+                stats = self.latency.setdefault(op, {'calls': 0, 'seconds': 0.0})
+                stats['calls'] += 1
+                stats['seconds'] += elapsed
+
+    @abstractmethod
+    def open(self, name: str = SPREADSHEET_NAME):
+        """Connect to the named spreadsheet."""
+
+    @abstractmethod
+    def worksheet(self, sheet_name: str):
+        """Handle with get_all_values() for a single sheet."""
+
+    @abstractmethod
+    def read_ranges(self, ranges: List[str], value_render_option: str = 'FORMATTED_VALUE') -> List[List[List[str]]]:
+        """Values for each A1 range, in order, with trailing blanks trimmed like the API.
+
+        value_render_option='FORMULA' returns formula cells as their formula text.
+        """
+
+    @abstractmethod
+    def batch_write(self, data: List[Dict], value_input_option: str = 'USER_ENTERED'):
+        """Write a list of {'range', 'values'} dicts in one request."""
+
+class GspreadBackend(SheetBackend):
+    """The live Google Sheets spreadsheet, via gspread."""
+
+    def __init__(self, credentials: Optional[Dict] = None):
+        super().__init__()
+        self.credentials = credentials
+        self.gc = None
+        self.spreadsheet = None
+
+    def open(self, name: str = SPREADSHEET_NAME):
+        import gspread  # Only needed when talking to the real API
+        if self.credentials:
+            self.gc = gspread.service_account_from_dict(self.credentials)
+        else:
+            self.gc = gspread.service_account()
+        self.spreadsheet = self._timed('open', self.gc.open, name)
+
+    def worksheet(self, sheet_name: str):
+        return self._timed('worksheet', self.spreadsheet.worksheet, sheet_name)
+
+    def read_ranges(self, ranges: List[str], value_render_option: str = 'FORMATTED_VALUE') -> List[List[List[str]]]:
+        response = self._timed('read', self.spreadsheet.values_batch_get, ranges,
+                               params={'valueRenderOption': value_render_option})
+        return [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+
+    def batch_write(self, data: List[Dict], value_input_option: str = 'USER_ENTERED'):
+        self._timed('write', self.spreadsheet.values_batch_update, body={
+            'valueInputOption': value_input_option,
+            'data': data
+        })
+
+class LocalWorksheet:
+    def __init__(self, backend: "LocalBackend", title: str):
+        self.backend = backend
+        self.title = title
+
+    def get_all_values(self) -> List[List[str]]:
+        return fill_gaps(self.backend.read_ranges([self.title])[0])
+
+class LocalBackend(SheetBackend):
+    """Offline stand-in backed by SQLite (in memory unless a path is given).
+
+    `latency` adds a fixed delay to every call and `quota_error_rate` makes
+    that fraction of calls raise QuotaExceededError, so load tests and
+    profiling can exercise throttling without network access.
+    """
+
+    def __init__(self, path: str = ":memory:", latency: float = 0.0,
+                 quota_error_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__()
+        self.latency_seconds = latency
+        self.quota_error_rate = quota_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS cells ("
+            "sheet TEXT, row INTEGER, col INTEGER, value TEXT, PRIMARY KEY (sheet, row, col))"
+        )
+
+    def _simulate(self):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.quota_error_rate and self._random.random() < self.quota_error_rate:
+            raise QuotaExceededError("Quota exceeded (simulated)")
+
+    def open(self, name: str = SPREADSHEET_NAME):
+        self._timed('open', self._simulate)
+
+    def worksheet(self, sheet_name: str) -> LocalWorksheet:
+        self._timed('worksheet', self._simulate)
+        return LocalWorksheet(self, sheet_name)
+
+    def load_sheet(self, sheet_name: str, values: List[List[str]]):
+        """Replace a sheet's contents, e.g. with synthetic race data."""
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM cells WHERE sheet = ?", (sheet_name,))
+            self.db.executemany(
+                "INSERT INTO cells VALUES (?, ?, ?, ?)",
+                ((sheet_name, r, c, str(value))
+                 for r, row in enumerate(values, start=1)
+                 for c, value in enumerate(row, start=1) if value != "")
+            )
+
+    def _read(self, range_name: str) -> List[List[str]]:
+        sheet, cells = split_range(range_name)
+        first_row, first_col, last_row, last_col = range_bounds(cells)
+        query = "SELECT row, col, value FROM cells WHERE sheet = ? AND row >= ? AND col >= ? AND value != ''"
+        params = [sheet, first_row, first_col]
+        if last_row is not None:
+            query += " AND row <= ?"
+            params.append(last_row)
+        if last_col is not None:
+            query += " AND col <= ?"
+            params.append(last_col)
+
+        grid: Dict[int, Dict[int, str]] = {}
+        for row, col, value in self.db.execute(query, params):
+            grid.setdefault(row - first_row, {})[col - first_col] = value
+        if not grid:
+            return []
+        values = []
+        for r in range(max(grid) + 1):
+            row_cells = grid.get(r, {})
+            values.append([row_cells.get(c, "") for c in range(max(row_cells) + 1)] if row_cells else [])
+        return values
+
+    def read_ranges(self, ranges: List[str], value_render_option: str = 'FORMATTED_VALUE') -> List[List[List[str]]]:
+        # Formulas aren't evaluated here, so every render option returns what was written
+        def read():
+            self._simulate()
+            with self._lock:
+                return [self._read(range_name) for range_name in ranges]
+        return self._timed('read', read)
+
+    def batch_write(self, data: List[Dict], value_input_option: str = 'USER_ENTERED'):
+        def write():
+            self._simulate()
+            with self._lock, self.db:
+                for update in data:
+                    sheet, cells = split_range(update['range'])
+                    first_row, first_col, _, _ = range_bounds(cells)
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?)",
+                        ((sheet, first_row + r, first_col + c, str(value))
+                         for r, row in enumerate(update['values'])
+                         for c, value in enumerate(row))
+                    )
+        self._timed('write', write)
+
+def create_backend(kind: Optional[str] = None) -> SheetBackend:
+    """Backend selected by SHEET_BACKEND ("gspread" or "local") and related env vars."""
+    kind = (kind or os.getenv('SHEET_BACKEND', 'gspread')).lower()
+    if kind == 'local':
+        return LocalBackend(
+            path=os.getenv('LOCAL_SHEET_DB', ':memory:'),
+            latency=float(os.getenv('LOCAL_SHEET_LATENCY', 0)),
+            quota_error_rate=float(os.getenv('LOCAL_SHEET_QUOTA_ERROR_RATE', 0))
+        )
+    if kind != 'gspread':
+        raise ValueError(f"Unknown SHEET_BACKEND: {kind}")
+
+    creds_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
+    credentials = json.loads(creds_json) if creds_json and creds_json != '{}' else None
+    return GspreadBackend(credentials)
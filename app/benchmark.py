@@ -0,0 +1,267 @@
+"""Synthetic race generator and benchmarks for the sync, leaderboard and leg-time parsing paths.
+
+Run from app/: python benchmark.py --teams 500 5000 --requests 200
+Results are appended to bench_results.jsonl and compared with the previous
+run for the same team count.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from backend import LocalBackend
+from function import RelayManager
+from legtimes import leg_totals, parse_leg_block, time_str_to_decimal
+from planner import WritePlan
+from racetable import column_index
+
+RESULTS_PATH = "bench_results.jsonl"
+
+def _random_time(rng: random.Random, low: int, high: int) -> str:
+    seconds = rng.randint(low, high)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def generate_race(teams: int, config: Dict, seed: int = 1) -> Dict[str, List[List[str]]]:
+    """Day1-Day3 form sheets and Open/Mixed division sheets for `teams` teams.
+
+    Includes the mess real sheets have: blank and malformed leg times, missing
+    or invalid handicaps, teams that skip a day and submissions for unknown teams.
+    """
+    rng = random.Random(seed)
+    timesheet_config = config['timesheet']
+    n_legs = column_index(timesheet_config["legEnd"]) - column_index(timesheet_config["legBegin"]) + 1
+    width = column_index(config["Day3"]["thcpace"]) + 1
+
+    sheets = {}
+    divisions = {"Open": [["Rank", "Team #", "Team Name", "Handicap"] + [""] * (width - 4), [""] * width],
+                 "Mixed": [["Rank", "Team #", "Team Name", "Handicap"] + [""] * (width - 4), [""] * width]}
+    for team in range(1, teams + 1):
+        roll = rng.random()
+        if roll < 0.05:
+            handicap = ""
+        elif roll < 0.06:
+            handicap = "n/a"
+        else:
+            handicap = f"{rng.uniform(0.85, 1.2):.2f}"
+        division = "Open" if rng.random() < 0.6 else "Mixed"
+        divisions[division].append(["", str(team), f"Team {team}", handicap] + [""] * (width - 4))
+    sheets.update(divisions)
+
+    header = ["Timestamp", "Email Address", "Team Number", "Start Time", "Concurrent Start"]
+    header += [f"Leg {leg}" for leg in range(1, n_legs + 1)]
+    for day_number, day in enumerate(["Day1", "Day2", "Day3"], start=1):
+        rows = [header, [""] * len(header)]
+        team_ids = [str(team) for team in range(1, teams + 1) if rng.random() < 0.97]
+        team_ids += [str(teams + extra) for extra in range(1, max(teams // 100, 1) + 1)]  # Not in any division
+        rng.shuffle(team_ids)
+        for team_id in team_ids:
+            legs = []
+            for _ in range(n_legs):
+                roll = rng.random()
+                if roll < 0.02:
+                    legs.append("")
+                elif roll < 0.025:
+                    legs.append(rng.choice(["0:3000", "abc", "1:60", " 0:30:00"]))
+                else:
+                    legs.append(_random_time(rng, 20 * 60, 70 * 60))
+            timestamp = f"10/{10 + day_number}/2024 {_random_time(rng, 8 * 3600, 18 * 3600)}"
+            rows.append([timestamp, f"team{team_id}@example.com", team_id, "7:00:00", ""] + legs)
+        sheets[day] = rows
+    return sheets
+
+def load_race(backend: LocalBackend, sheets: Dict[str, List[List[str]]]):
+    for sheet_name, values in sheets.items():
+        backend.load_sheet(sheet_name, values)
+
+def _api_calls(backend: LocalBackend) -> Dict[str, int]:
+    return {op: int(stats['calls']) for op, stats in backend.latency.items()}
+
+def bench_sync(teams: int, seed: int = 1) -> Dict:
+    """Time each phase of a full sync against the local backend."""
+    manager = RelayManager(backend=LocalBackend())
+    load_race(manager.backend, generate_race(teams, manager.config, seed))
+    manager.backend.latency.clear()
+
+    start = time.perf_counter()
+    manager.prefetch_values()
+    fetch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for sheet_name in manager.days + manager.divisions:
+        manager.get_race_table(sheet_name)
+    for day in manager.days:
+        manager.day_leg_times(day)
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pending = manager.plan_all()
+    plan = time.perf_counter() - start
+
+    write_plan = WritePlan(pending)
+    start = time.perf_counter()
+    manager.send_plan(write_plan)
+    write = time.perf_counter() - start
+
+    calls = _api_calls(manager.backend)
+
+    # A follow-up sync after 1% of teams submit again only has to read and plan those rows
+    day3 = manager.backend.read_ranges(["Day3"])[0]
+    resubmitted = [row[:5] + ["0:20:00"] * (len(row) - 5) for row in day3[2:2 + max(teams // 100, 1)]]
+    manager.backend.load_sheet("Day3", day3 + resubmitted)
+    start = time.perf_counter()
+    manager.update_all_divisions()
+    incremental = time.perf_counter() - start
+    incremental_cells = sum(stats['written'] for stats in manager.write_stats.values())
+
+    # Second pass with tracemalloc on, so its overhead doesn't skew the timings
+    manager = RelayManager(backend=LocalBackend())
+    load_race(manager.backend, generate_race(teams, manager.config, seed))
+    tracemalloc.start()
+    manager.update_all_divisions()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'fetch_seconds': fetch,
+        'parse_seconds': parse,
+        'plan_seconds': plan,
+        'write_seconds': write,
+        'cells': sum(len(updates) for updates in pending.values()),
+        'ranges': len(write_plan.data),
+        'payload_bytes': len(json.dumps(write_plan.data)),
+        'api_reads': calls.get('read', 0),
+        'api_writes': calls.get('write', 0),
+        'peak_memory_bytes': peak,
+        'incremental_sync_seconds': incremental,
+        'incremental_cells': incremental_cells
+    }
+
+def bench_leaderboard(teams: int, requests: int, seed: int = 1) -> Dict:
+    """Cold and warm latency of the / route served from the snapshot."""
+    import server  # Imported here so sync-only runs don't pay for Flask
+
+    backend = LocalBackend()
+    load_race(backend, generate_race(teams, server.config, seed))
+    RelayManager(backend=backend).update_all_divisions()  # Leaderboard reads synced results
+    backend.latency.clear()
+    # Swap in the synthetic sheet and a fresh snapshot only for this run, so importers of server are unaffected
+    with patch.object(server, "AUTO_UPDATE_ENABLED", False), patch.object(server, "SNAPSHOT_PATH", ""), \
+            patch.object(server, "_backend", backend), patch.object(server, "snapshot", server.LeaderboardSnapshot()), \
+            patch.object(server, "_responses", server.ResponseCache()), patch.object(server, "broker", server.DeltaBroker()):
+        client = server.app.test_client()
+
+        start = time.perf_counter()
+        client.get("/")
+        cold = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.get("/")
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+        not_modified = client.get("/", headers={"If-None-Match": response.headers["ETag"]})
+
+    return {
+        'cold_seconds': cold,
+        'mean_seconds': sum(latencies) / len(latencies),
+        'p95_seconds': latencies[int(len(latencies) * 0.95) - 1],
+        'response_bytes': len(response.data),
+        'gzip_bytes': len(compressed.data),
+        'not_modified_bytes': len(not_modified.data),
+        'api_reads': _api_calls(backend).get('read', 0)
+    }
+
+def bench_legtimes(teams: int, seed: int = 1) -> Dict:
+    """Parse one day sheet's leg times cell by cell and as one vectorized block."""
+    config = RelayManager().config
+    rows = generate_race(teams, config, seed)["Day1"][2:]
+    begin = column_index(config["timesheet"]["legBegin"])
+    end = column_index(config["timesheet"]["legEnd"])
+
+    start = time.perf_counter()
+    scalar = []
+    for row in rows:
+        times = [t for t in map(time_str_to_decimal, row[begin:end + 1]) if t is not None]
+        scalar.append(sum(times) if times else None)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals, has_time = leg_totals(*parse_leg_block(rows, begin, end))
+    batch_seconds = time.perf_counter() - start
+
+    batch = [total if has_time[i] else None for i, total in enumerate(totals.tolist())]
+    if batch != scalar:
+        raise AssertionError("batch and scalar leg totals differ")
+    return {
+        'scalar_seconds': scalar_seconds,
+        'batch_seconds': batch_seconds,
+        'speedup': scalar_seconds / batch_seconds
+    }
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def _previous_result(path: str, teams: int) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('teams') == teams:
+                previous = record
+    return previous
+
+def _report(name: str, metrics: Dict, previous: Optional[Dict]):
+    print(f"  {name}:")
+    for key, value in metrics.items():
+        line = f"    {key}: {value:.4f}" if isinstance(value, float) else f"    {key}: {value}"
+        old = (previous or {}).get(name, {}).get(key)
+        if old:
+            line += f" ({(value - old) / old * 100:+.1f}% vs {previous.get('revision') or 'previous'})"
+        print(line)
+
+def run(team_counts: List[int], requests: int, output: str = RESULTS_PATH, seed: int = 1):
+    for teams in team_counts:
+        record = {
+            'teams': teams,
+            'requests': requests,
+            'revision': _git_revision(),
+            'timestamp': time.time(),
+            'sync': bench_sync(teams, seed),
+            'leaderboard': bench_leaderboard(teams, requests, seed),
+            'legtimes': bench_legtimes(teams, seed)
+        }
+        previous = _previous_result(output, teams)
+        print(f"{teams} teams:")
+        _report('sync', record['sync'], previous)
+        _report('leaderboard', record['leaderboard'], previous)
+        _report('legtimes', record['legtimes'], previous)
+        with open(output, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark sync and leaderboard paths on synthetic race data")
+    parser.add_argument("--teams", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--requests", type=int, default=200, help="leaderboard requests per run")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="keep the sync's per-row logging")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.ERROR)
+    run(args.teams, args.requests, args.output, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+VALUES_TTL_SECONDS = 300.0
+MAX_ENTRIES = 128
+_DEFAULT_TTL = object()
+MISSING = object()  # Default for get() when None is a value worth caching
+
+class SheetCache:
+    """LRU cache of per-sheet data with optional per-entry expiry.
+
+    Entries are keyed by (sheet, kind), e.g. ("Open", "values"), so everything
+    cached for a sheet can be dropped at once after writing to it. A ttl of
+    None keeps an entry until it is evicted or invalidated.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, default_ttl: Optional[float] = VALUES_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, float, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def put(self, sheet: str, kind: str, value: Any, ttl: Optional[float] = _DEFAULT_TTL):
+        ttl = self.default_ttl if ttl is _DEFAULT_TTL else ttl
+        now = time.monotonic()
+        with self._lock:
+            self._entries[(sheet, kind)] = (value, now, None if ttl is None else now + ttl)
+            self._entries.move_to_end((sheet, kind))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, sheet: str, kind: str, default: Any = None) -> Any:
+        """Cached value, or `default` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get((sheet, kind))
+            if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+                del self._entries[(sheet, kind)]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end((sheet, kind))
+            self.hits += 1
+            return entry[0]
+
+    def invalidate(self, sheet: Optional[str] = None, keep: Iterable[str] = ()) -> int:
+        """Drop a sheet's entries (every sheet's if None) except the kinds in `keep`."""
+        keep = set(keep)
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (sheet is None or key[0] == sheet) and key[1] not in keep]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def age(self, sheet: str, kind: str) -> Optional[float]:
+        """Seconds since an entry was stored, or None if it isn't cached."""
+        with self._lock:
+            entry = self._entries.get((sheet, kind))
+            return None if entry is None else time.monotonic() - entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters plus the current size and hit ratio, for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'oldest_seconds': max((time.monotonic() - e[1] for e in self._entries.values()), default=0.0)
+            }
@@ -1,10 +1,21 @@
-import json
-import gspread
-from datetime import datetime
+from a1 import absolute_range_name, fill_gaps
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+import threading
 import time
-from google.api_core import retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from legtimes import format_hours, leg_totals
+from racetable import DIVISION_TEAM_COLUMN, DIVISIONS, RaceTable, column_index, column_letter
+from backend import SheetBackend, create_backend
+from cache import MISSING, SheetCache
+from ingest import FIRST_RESPONSE_ROW, DayLog
+from memo import RowMemo
+from metrics import REGISTRY
+from planner import WritePlan
+from ratelimit import RateLimiter
+from settings import config_version, load_config
+from teams import TeamEntry, TeamRegistry, build_registry
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,298 +23,630 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class RateLimiter:
-    def __init__(self, max_requests: int = 60, time_window: int = 60):
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = []
-    
-    def wait_if_needed(self):
-        current_time = time.time()
-        self.requests = [req_time for req_time in self.requests 
-                        if current_time - req_time < self.time_window]
-        
-        if len(self.requests) >= self.max_requests:
-            sleep_time = self.requests[0] + self.time_window - current_time
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, waiting {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-            self.requests = self.requests[1:]
-        
-        self.requests.append(current_time)
-
 class RelayManager:
-    def __init__(self, config_path: str = 'columnValues.json'):
-        self.config = self._load_config(config_path)
-        self.gc = None
-        self.spreadsheet = None
-        self.divisions = ["Open", "Mixed"]
+    def __init__(self, config_path: Optional[str] = None, backend: Optional[SheetBackend] = None):
+        self.config_path = config_path
+        self.backend = backend
+        self.divisions = list(DIVISIONS)
         self.days = ["Day1", "Day2", "Day3"]
         self.rate_limiter = RateLimiter()
-        self.cache = {}
-        
-    def _load_config(self, config_path: str) -> Dict:
+        self.cache = SheetCache()
+        self.row_memo = RowMemo()  # Planned cells per team and day, reused while their inputs don't change
+        self.last_written: Dict[Tuple[str, str], str] = {}  # (sheet, cell) -> value we last sent
+        self.last_rendered: Dict[Tuple[str, str], str] = {}  # (sheet, cell) -> formula result first read after the write
+        self.write_stats: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.last_sync_seconds: Optional[float] = None
+        self.task_results: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.RLock()
+        self.dirty_teams: Dict[str, Optional[Set[str]]] = {}  # Teams to replan per day; None means all
+        self._division_keys: Dict[str, Dict[str, Tuple]] = {}
+        self.team_registry: Optional[TeamRegistry] = None
+        self._replan_all = False
+        self.verifying = False  # Whether this sync's read was a full verify
+        self._config_version = config_version(config_path)
+        self._apply_config(self._load_config(config_path))
+
+    def _apply_config(self, config: Dict):
+        self.config = config
+        # "formula" keeps pace/handicap/totals as sheet formulas, "values" computes them here
+        self.write_mode = self.config.get("writeMode", "formula")
+        self.course_distance = float(self.config.get("courseDistance", 95.3))
+        # Day sheets only grow, so after the first sync only their new rows are read
+        team_col = self.config['timesheet'].get("raceNumber", 2)
+        self.day_logs = {day: DayLog(team_col) for day in self.days}
+        self.full_verify_every = int(self.config.get("fullVerifyEvery", 10))
+
+    def reload_config_if_changed(self) -> bool:
+        """Pick up edits to columnValues.json, dropping everything derived from the old layout."""
+        version = config_version(self.config_path)
+        if version == self._config_version:
+            return False
+        logger.info("Column config changed, reloading it and replanning every team")
+        with self._lock:
+            self._apply_config(self._load_config(self.config_path))
+            self._config_version = version
+            self.cache.invalidate(keep=("worksheet",))
+            self.row_memo.clear()
+            self._division_keys = {}
+            self.team_registry = None
+            self._replan_all = True
+        return True
+
+    def _load_config(self, config_path: Optional[str]) -> Dict:
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            return load_config(config_path)
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             raise
 
     def connect_sheets(self):
         try:
-            self.gc = gspread.service_account()
-            self.spreadsheet = self.gc.open("Relay Data")
-            logger.info("Successfully connected to Google Sheets")
+            if self.backend is None:
+                self.backend = create_backend()
+            self.backend.open("Relay Data")
+            logger.info(f"Successfully connected to Google Sheets ({type(self.backend).__name__})")
         except Exception as e:
             logger.error(f"Error connecting to sheets: {e}")
             raise
 
     def get_cached_worksheet(self, sheet_name: str):
-        if sheet_name not in self.cache:
-            self.rate_limiter.wait_if_needed()
-            self.cache[sheet_name] = self.spreadsheet.worksheet(sheet_name)
-        return self.cache[sheet_name]
+        worksheet = self.cache.get(sheet_name, "worksheet")
+        if worksheet is None:
+            # Handles don't go stale, so keep them until evicted
+            worksheet = self.rate_limiter.call(self.backend.worksheet, sheet_name)
+            self.cache.put(sheet_name, "worksheet", worksheet, ttl=None)
+        return worksheet
 
     def get_cached_values(self, sheet_name: str):
-        cache_key = f"{sheet_name}_values"
-        if cache_key not in self.cache:
-            self.rate_limiter.wait_if_needed()
+        values = self.cache.get(sheet_name, "values", MISSING)
+        if values is MISSING:
             worksheet = self.get_cached_worksheet(sheet_name)
-            self.cache[cache_key] = worksheet.get_all_values()
-        return self.cache[cache_key]
+            values = self.rate_limiter.call(worksheet.get_all_values)
+            self.cache.put(sheet_name, "values", values)
+        return values
+
+    def get_race_table(self, sheet_name: str) -> RaceTable:
+        """Columnar view of a sheet, rebuilt only when its cached values change."""
+        with self._lock:
+            values = self.get_cached_values(sheet_name)
+            cached = self.cache.get(sheet_name, "table")
+            if cached is None or cached[0] is not values:
+                with REGISTRY.timer("mor_sync_phase_seconds", phase="parse", sheet=sheet_name):
+                    if sheet_name in self.days:
+                        table = RaceTable.from_day_values(values, self.config)
+                    else:
+                        table = RaceTable.from_division_values(values, self.config)
+                cached = (values, table)
+                self.cache.put(sheet_name, "table", cached)
+            return cached[1]
+
+    def day_leg_times(self, day: str) -> Tuple[RaceTable, List[Optional[Dict]]]:
+        """Day table plus its leg totals, computed once per fetched sheet."""
+        with self._lock:
+            table = self.get_race_table(day)
+            cached = self.cache.get(day, "times")
+            if cached is None or cached[0] is not table:
+                with REGISTRY.timer("mor_sync_phase_seconds", phase="parse", sheet=day):
+                    cached = (table, self.table_leg_times(table))
+                self.cache.put(day, "times", cached)
+            return table, cached[1]
+
+    def get_team_registry(self) -> TeamRegistry:
+        """Teams of every division, rebuilt only when a division sheet is re-parsed."""
+        with self._lock:
+            tables = {division: self.get_race_table(division) for division in self.divisions}
+            self.team_registry = build_registry(tables, self.team_registry)
+            return self.team_registry
+
+    def sheet_ranges(self) -> Dict[str, str]:
+        """A1 range each sheet needs for a sync, keyed by sheet name."""
+        timesheet_config = self.config['timesheet']
+        ranges = {day: f"A:{timesheet_config['legEnd']}" for day in self.days}
+
+        # Division sheets need the team, handicap and every result column
+        division_columns = [self.config.get("handicapFactor", "D"), DIVISION_TEAM_COLUMN]
+        for day in self.days:
+            division_columns.extend(self.config[day].values())
+        last_col = column_letter(max(column_index(col) for col in division_columns))
+        ranges.update({division: f"A:{last_col}" for division in self.divisions})
+        return ranges
+
+    def _read_values(self, ranges: Dict[str, str],
+                     value_render_option: str = 'FORMATTED_VALUE') -> Dict[str, List[List[str]]]:
+        """Read A1 ranges for several sheets in one request, padding ragged rows like get_all_values."""
+        sheet_values = self.rate_limiter.call(
+            self.backend.read_ranges,
+            [absolute_range_name(name, cells) for name, cells in ranges.items()],
+            value_render_option
+        )
+        return {
+            name: fill_gaps(values, cols=column_index(ranges[name].split(':')[1].rstrip('0123456789')) + 1)
+            for name, values in zip(ranges, sheet_values)
+        }
+
+    def prefetch_values(self):
+        """Read every division sheet and the unread tail of each day sheet in a single batch request."""
+        self.reload_config_if_changed()
+        with REGISTRY.timer("mor_sync_phase_seconds", phase="fetch"):
+            self._prefetch_values()
+
+    def _prefetch_values(self):
+        ranges = self.sheet_ranges()
+        requested = dict(ranges)
+        verify = False
+        for day, log in self.day_logs.items():
+            if log.can_tail(self.full_verify_every):
+                first_col, last_col = ranges[day].split(':')
+                requested[day] = f"{first_col}{log.high_water}:{last_col}"
+            elif log.high_water >= FIRST_RESPONSE_ROW:
+                verify = True
 
-    def time_str_to_decimal(self, time_str: str) -> Optional[float]:
+        logger.info(f"Fetching {len(requested)} sheets in one batch request")
+        values_by_sheet = self._read_values(requested)
+
+        changed: Dict[str, Set[str]] = {}
+        reread = {}
+        for day, log in self.day_logs.items():
+            if requested[day] == ranges[day]:
+                changed[day] = log.apply_full(values_by_sheet[day])
+                continue
+            teams = log.apply_tail(values_by_sheet[day], log.high_water)
+            if teams is None:
+                logger.info(f"{day} changed above row {log.high_water}, reading it in full")
+                reread[day] = ranges[day]
+            else:
+                changed[day] = teams
+        if reread:
+            verify = True
+            for day, values in self._read_values(reread).items():
+                changed[day] = self.day_logs[day].apply_full(values)
+
+        for day, log in self.day_logs.items():
+            self.cache.put(day, "values", log.rows)
+            logger.info(f"{day}: {len(changed[day])} teams with new or edited responses, read through row {log.high_water} ({log.last_timestamp})")
+        for division in self.divisions:
+            self.cache.put(division, "values", values_by_sheet[division])
+        if verify:
+            # Compare against what the division sheets really hold, formulas included, not what was last sent
+            formulas = self._read_values({division: ranges[division] for division in self.divisions}, 'FORMULA')
+            for division, values in formulas.items():
+                self.cache.put(division, "formulas", values)
+        self.verifying = verify
+        self._plan_dirty_teams(changed, verify)
+
+    def _plan_dirty_teams(self, changed: Dict[str, Set[str]], verify: bool = False):
+        """Decide which teams each day needs to replan after a read.
+
+        A full verify replans every team, so division cells that were cleared
+        or overwritten on the sheet get written again.
+        """
+        # Teams that moved rows or had their handicap edited need every day replanned
+        division_changes = set()
+        registry = self.get_team_registry()
+        for division in self.divisions:
+            keys = registry.keys(division)
+            previous = self._division_keys.get(division, {})
+            division_changes.update(team_id for team_id, key in keys.items() if previous.get(team_id) != key)
+            division_changes.update(team_id for team_id in previous if team_id not in keys)
+            self._division_keys[division] = keys
+
+        if self._replan_all or verify:
+            self.dirty_teams = {day: None for day in self.days}
+            self._replan_all = False
+            return
+
+        # Cumulative totals carry a change on one day into every later day
+        carried = set(division_changes)
+        self.dirty_teams = {}
+        for day in self.days:
+            carried |= changed[day]
+            self.dirty_teams[day] = set(carried)
+
+    def _cell_unchanged_at(self, sheet_name: str, sheet_values: List[List[str]], cell: str,
+                           row: int, col: int, value: str,
+                           sheet_formulas: Optional[List[List[str]]] = None) -> bool:
+        """Check whether a planned cell, at its 1-based row and column, already holds the value we want to write.
+
+        With sheet_formulas (the sheet read with valueRenderOption=FORMULA, on
+        verify syncs) formulas are compared with what the sheet really holds.
+        """
         try:
-            if not time_str or not time_str.strip():
-                return None
-            
-            parts = time_str.split(':')
-            if len(parts) != 3:
-                return None
-                
-            hours = float(parts[0])
-            minutes = float(parts[1])
-            seconds = float(parts[2])
-            
-            return hours + (minutes / 60) + (seconds / 3600)
-        except:
-            return None
-
-    def decimal_to_time_str(self, decimal_time: float) -> str:
-        hours = int(decimal_time)
-        minutes = int((decimal_time * 60) % 60)
-        seconds = int((decimal_time * 3600) % 60)
+            current = sheet_values[row - 1][col - 1]
+        except IndexError:
+            current = ""
+
+        if not current:
+            return False  # Blank or cleared cells always get written
+
+        if not value.startswith("="):
+            return current == value  # A hand-edited or stale value gets corrected
+        if sheet_formulas is not None:
+            try:
+                return str(sheet_formulas[row - 1][col - 1]) == value
+            except IndexError:
+                return False
+
+        # Formulas are read back as their rendered result, so rely on what we last sent,
+        # for as long as the sheet still shows the result it showed right after that write
+        key = (sheet_name, cell)
+        if self.last_written.get(key) != value:
+            return False
+        return current == self.last_rendered.setdefault(key, current)
+
+    def record_written(self, sheet_name: str, updates: List[Dict]):
+        """Remember what was sent so unchanged formulas can be skipped next run."""
+        for update in updates:
+            key = (sheet_name, update['range'])
+            self.last_written[key] = str(update['values'][0][0])
+            self.last_rendered.pop(key, None)
+
+    def decimal_to_time_str(self, decimal_time: float, pad_hours: bool = False) -> str:
+        # Truncate to whole seconds, nudged past float error (2.7h -> 2:42:00, not 2:41:59).
+        # Only values mode uses this; elapsed times keep format_hours' original arithmetic.
+        total_seconds = int(decimal_time * 3600 + 1e-6)
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        if pad_hours:
+            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
         return f"{hours}:{minutes:02d}:{seconds:02d}"
 
-    def calculate_leg_times(self, values: List[str], timesheet_config: Dict) -> Optional[Dict]:
-        """Calculate leg times while preserving team information."""
-        try:
-            start_idx = ord(timesheet_config["legBegin"]) - 65
-            end_idx = ord(timesheet_config["legEnd"]) - 65
-            
-            leg_times = values[start_idx:end_idx+1]
-            times = []
-            
-            for time_str in leg_times:
-                if time_str and time_str.strip():
-                    decimal_time = self.time_str_to_decimal(time_str)
-                    if decimal_time is not None:
-                        times.append(decimal_time)
-
-            if not times:
-                return None
-
-            total_time = sum(times)
-            return {
-                'elapsed': self.decimal_to_time_str(total_time),
-                'decimal': total_time
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating leg times: {e}")
-            return None
+    def table_leg_times(self, table: RaceTable) -> List[Optional[Dict]]:
+        """Leg totals for every team in a day table, aligned with its positions."""
+        return self._leg_times(table.leg_hours, table.leg_valid)
+
+    def _leg_times(self, hours, valid) -> List[Optional[Dict]]:
+        totals, has_time = leg_totals(hours, valid)
+        # A nan or infinite leg can't be formatted, so the row gets no time, as it always has
+        has_time &= np.isfinite(totals)
+        elapsed = format_hours(np.where(has_time, totals, 0.0))
+        return [
+            {'elapsed': elapsed[i], 'decimal': total} if has_time[i] else None
+            for i, total in enumerate(totals.tolist())
+        ]
+
+    def _formula_cells(self, day: str, div_row: int, times: Dict, handicap_factor: float) -> Dict[str, str]:
+        """Actual time plus sheet formulas for pace, handicap and cumulative totals."""
+        day_columns = self.config[day]
+        distance = self.course_distance
+        cells = {
+            "act": times['elapsed'],
+            "actpace": f"=TEXT(({day_columns['act']}{div_row})/{distance}, \"hh:mm:ss\")",
+            "hc": f"={day_columns['act']}{div_row}*{handicap_factor}",
+            "hcpace": f"=TEXT(({day_columns['hc']}{div_row})/{distance}, \"hh:mm:ss\")"
+        }
+
+        # Handle cumulative totals for Day2 and Day3
+        if day in ["Day2", "Day3"]:
+            logger.debug("Processing cumulative totals for %s row %s", day, div_row)
+
+            # Build cumulative time formula
+            prev_days = self.days[:self.days.index(day)]  # Get all previous days
+            formula_parts = []
+            valid_days = 1  # Start with the current day
+
+            # Start with current day
+            current_time_cell = f'{day_columns["act"]}{div_row}'
+            formula_parts.append(f'TIMEVALUE({current_time_cell})*24')  # Convert current time to hours
+
+            # Add previous days
+            for prev_day in prev_days:
+                prev_col = self.config[prev_day]["act"]
+                prev_cell = f'{prev_col}{div_row}'
+                formula_parts.append(f'IF(NOT(ISBLANK({prev_cell})), TIMEVALUE({prev_cell})*24, 0)')  # Add previous day's time in hours
+                valid_days += 1
+
+            # Construct final formulas
+            time_sum = '+'.join(formula_parts)  # Sum all time values (current day + previous days)
+
+            # Total time formula (sum of all times in hh:mm:ss format)
+            total_time_formula = f'=TEXT(({time_sum})/24, "h:mm:ss")'
+
+            # Total pace formula (total time / total distance)
+            total_pace_formula = f'=TEXT((({time_sum})/24)/({distance}*{valid_days}), "h:mm:ss")'
+
+            logger.debug("Adding formulas for row %s: Time=%s, Pace=%s", div_row, total_time_formula, total_pace_formula)
+
+            cells.update({
+                "tact": total_time_formula,
+                "tactpace": total_pace_formula,
+                "thc": f'={day_columns["tact"]}{div_row}*{handicap_factor}',
+                "thcpace": f'=TEXT(({day_columns["thc"]}{div_row})/{distance}, "hh:mm:ss")'
+            })
+
+        return cells
+
+    def _computed_cells(self, day: str, division: str, div_row: int, times: Dict,
+                        handicap_factor: float, division_table: RaceTable, div_pos: int) -> Dict[str, str]:
+        """Same cells as _formula_cells, calculated here and written as plain values."""
+        distance = self.course_distance
+        actual = times['decimal']
+        handicap = actual * handicap_factor
+        cells = {
+            "act": times['elapsed'],
+            "actpace": self.decimal_to_time_str(actual / distance, pad_hours=True),
+            "hc": self.decimal_to_time_str(handicap),
+            "hcpace": self.decimal_to_time_str(handicap / distance, pad_hours=True)
+        }
+
+        if day in ["Day2", "Day3"]:
+            prev_days = self.days[:self.days.index(day)]
+            total = actual
+            for prev_day in prev_days:
+                # Prefer this sync's result, fall back to what the sheet already shows
+                prev_table, prev_times = self.day_leg_times(prev_day)
+                prev_pos = prev_table.position(division_table.team_ids[div_pos])
+                if prev_pos is not None and prev_times[prev_pos]:
+                    prev_hours = prev_times[prev_pos]['decimal']
+                else:
+                    prev_seconds = int(division_table.results[self.config[prev_day]["act"]][div_pos])
+                    prev_hours = max(prev_seconds, 0) / 3600
+                total += prev_hours
+
+            valid_days = 1 + len(prev_days)
+            total_handicap = total * handicap_factor
+            cells.update({
+                "tact": self.decimal_to_time_str(total),
+                "tactpace": self.decimal_to_time_str(total / (distance * valid_days)),
+                "thc": self.decimal_to_time_str(total_handicap),
+                "thcpace": self.decimal_to_time_str(total_handicap / distance, pad_hours=True)
+            })
+
+        return cells
+
+    def _row_cells(self, day: str, division: str, team_id: str, entry: TeamEntry, times: Dict,
+                   division_table: RaceTable) -> Tuple[Tuple[str, int, int, str], ...]:
+        """One team's planned cells for a day as (A1, row, column, value).
+
+        Formula cells only depend on the inputs in the memo key, so they are
+        built once per distinct input; values mode reads other days' results
+        and is always recalculated.
+        """
+        key = None
+        if self.write_mode != "values":
+            key = RowMemo.key("cells", day, team_id, entry.row, entry.handicap, times['elapsed'], self.course_distance)
+            planned = self.row_memo.get(key)
+            if planned is not None:
+                return planned
+            cells = self._formula_cells(day, entry.row, times, entry.handicap)
+        else:
+            cells = self._computed_cells(day, division, entry.row, times, entry.handicap, division_table, entry.position)
+
+        day_columns = self.config[day]
+        planned = tuple(
+            (f"{day_columns[name]}{entry.row}", entry.row, column_index(day_columns[name]) + 1, str(value))
+            for name, value in cells.items()
+        )
+        if key is not None:
+            self.row_memo.put(key, planned)
+        return planned
+
+    def write_updates(self, updates_by_sheet: Dict[str, List[Dict]], invalidate: bool = True) -> int:
+        """Send updates for any number of sheets in as few batch requests as possible.
+
+        Cached values of the written sheets are dropped afterwards unless
+        `invalidate` is False, e.g. while other pairs of a sync still read them.
+        """
+        return self.send_plan(WritePlan(updates_by_sheet), invalidate)
+
+    def send_plan(self, plan: WritePlan, invalidate: bool = True) -> int:
+        """Send a WritePlan's batches; returns the number of requests made."""
+        if not plan:
+            return 0
+
+        write_bucket = self.rate_limiter.buckets['write']
+        cost = plan.cost(write_bucket.tokens, write_bucket.capacity)
+        logger.info(f"Writing {cost['cells']} cells as {cost['ranges']} ranges in {cost['requests']} requests ({cost['bytes']} bytes)")
+        if cost['quota_wait_seconds'] > 0:
+            logger.warning(f"Write plan exceeds the remaining write quota, expect ~{cost['quota_wait_seconds']:.0f}s of waiting")
+
+        sheets = ",".join(sorted(plan.updates_by_sheet))
+        with REGISTRY.timer("mor_sync_phase_seconds", phase="write", sheet=sheets):
+            for i, batch in enumerate(plan.batches, start=1):
+                logger.info(f"Sending batch {i}/{len(plan.batches)} with {len(batch)} ranges")
+                self.rate_limiter.call(self.backend.batch_write, batch, 'USER_ENTERED', kind='write')
+
+        for sheet_name, updates in plan.updates_by_sheet.items():
+            self.record_written(sheet_name, updates)
+            REGISTRY.inc("mor_cells_written_total", len(updates), sheet=sheet_name)
+            if invalidate:
+                self.cache.invalidate(sheet_name, keep=("worksheet",))
+        return len(plan.batches)
 
     def update_division_times(self, day: str, division: str) -> Tuple[int, int]:
+        """Plan and immediately write a single division/day pair."""
+        division_updates, matches_found, total_attempts = self.plan_division_updates(day, division)
         try:
-            matches_found = 0
-            total_attempts = 0
-
-            logger.info(f"Getting sheets for {day} and {division}")
-            day_sheet = self.get_cached_worksheet(day)
-            division_sheet = self.get_cached_worksheet(division)
-            
-            day_values = self.get_cached_values(day)
-            division_values = self.get_cached_values(division)
-            
-            timesheet_config = self.config['timesheet']
-            day_columns = self.config[day]
-            handicap_factor_col = self.config.get("handicapFactor", "D")  # Default to column D
-            
-            division_dict = {row[1].strip(): idx + 1 for idx, row in enumerate(division_values[1:]) 
-                        if row and len(row) > 1 and row[1].strip()}
-
-            division_updates = []
-            
-            # Determine the last row with data in the day sheet
-            last_row = len(day_values)
-            
-            # Process rows dynamically
-            for row_idx, row in enumerate(day_values[2:last_row], start=3):
-                if not row or len(row) < 3:
-                    continue
-
-                team_id = row[2].strip()  # Column C
-                if not team_id:
-                    continue
-
-                total_attempts += 1
-                
-                if team_id in division_dict:
-                    div_row = division_dict[team_id] + 1
-                    matches_found += 1
-                    
-                    # Get the handicap factor from column D
-                    try:
-                        handicap_factor = float(division_values[div_row - 1][ord(handicap_factor_col) - 65])
-                    except (ValueError, IndexError, TypeError):
-                        # If the handicap factor is missing or invalid, default to 1
-                        handicap_factor = 1.0
-                        logger.warning(f"No valid handicap factor for team {team_id} in row {div_row}. Using factor 1.")
-                    
-                    # Calculate times
-                    times = self.calculate_leg_times(row, timesheet_config)
-                    
-                    if times:
-                        decimal_pace = times['decimal'] / 95.3
-                        actual_pace = self.decimal_to_time_str(decimal_pace)
-                        
-                        # Update division sheet with actual time and pace
-                        division_updates.extend([
-                            {
-                                'range': f'{day_columns["act"]}{div_row}',
-                                'values': [[times['elapsed']]]
-                            },
-                            {
-                                'range': f'{day_columns["actpace"]}{div_row}',
-                                'values': [[f"=TEXT(({day_columns['act']}{div_row})/95.3, \"hh:mm:ss\")"]]
-                            },
-                            {
-                                'range': f'{day_columns["hc"]}{div_row}',
-                                'values': [[f"={day_columns['act']}{div_row}*{handicap_factor}"]]
-                            },
-                            {
-                                'range': f'{day_columns["hcpace"]}{div_row}',
-                                'values': [[f"=TEXT(({day_columns['hc']}{div_row})/95.3, \"hh:mm:ss\")"]]
-                            }
-                        ])
-                        
-                        # Handle cumulative totals for Day2 and Day3
-                        if day in ["Day2", "Day3"]:
-                            logger.info(f"Processing cumulative totals for {day} Row {div_row}")
-                            
-                            # Build cumulative time formula
-                            prev_days = self.days[:self.days.index(day)]  # Get all previous days
-                            formula_parts = []
-                            valid_days = 1  # Start with the current day
-                            
-                            # Start with current day
-                            current_time_cell = f'{day_columns["act"]}{div_row}'
-                            formula_parts.append(f'TIMEVALUE({current_time_cell})*24')  # Convert current time to hours
-                            
-                            # Add previous days
-                            for prev_day in prev_days:
-                                prev_col = self.config[prev_day]["act"]
-                                prev_cell = f'{prev_col}{div_row}'
-                                formula_parts.append(f'IF(NOT(ISBLANK({prev_cell})), TIMEVALUE({prev_cell})*24, 0)')  # Add previous day's time in hours
-                                valid_days += 1
-                            
-                            # Construct final formulas
-                            time_sum = '+'.join(formula_parts)  # Sum all time values (current day + previous days)
-                            
-                            # Total time formula (sum of all times in hh:mm:ss format)
-                            total_time_formula = f'=TEXT(({time_sum})/24, "h:mm:ss")'
-                            
-                            # Total pace formula (total time / total distance)
-                            total_pace_formula = f'=TEXT((({time_sum})/24)/(95.3*{valid_days}), "h:mm:ss")'
-                            
-                            # Handicap formulas
-                            total_hc_formula = f'={day_columns["tact"]}{div_row}*{handicap_factor}'
-                            total_hcpace_formula = f'=TEXT(({day_columns["thc"]}{div_row})/95.3, "hh:mm:ss")'
-                            
-                            logger.info(f"Adding formulas for row {div_row}: Time={total_time_formula}, Pace={total_pace_formula}")
-                            
-                            division_updates.extend([
-                                {
-                                    'range': f'{day_columns["tact"]}{div_row}',
-                                    'values': [[total_time_formula]] 
-                                },
-                                {
-                                    'range': f'{day_columns["tactpace"]}{div_row}',
-                                    'values': [[total_pace_formula]]  
-                                },
-                                {
-                                    'range': f'{day_columns["thc"]}{div_row}',
-                                    'values': [[total_hc_formula]]  
-                                },
-                                {
-                                    'range': f'{day_columns["thcpace"]}{div_row}',
-                                    'values': [[total_hcpace_formula]]  
-                                }
-                            ])
-
-            # Perform batch updates
-            if division_updates:
-                logger.info(f"Performing batch update for {division} {day} with {len(division_updates)} updates")
-                self.rate_limiter.wait_if_needed()
-                division_sheet.batch_update(division_updates, value_input_option='USER_ENTERED')
-                logger.info(f"Batch update completed successfully")
-
-            logger.info(f"Updated {division} division for {day}: {matches_found}/{total_attempts} matches")
+            self.write_updates({division: division_updates})
             return matches_found, total_attempts
-            
         except Exception as e:
-            logger.error(f"Error updating {division} division for {day}: {e}", exc_info=True)
+            logger.error(f"Error writing {division} division for {day}: {e}", exc_info=True)
             return 0, 0
 
-    def update_all_divisions(self) -> Dict[str, Dict[str, Tuple[int, int]]]:
-        results = {}
-        
+    def plan_division_updates(self, day: str, division: str) -> Tuple[List[Dict], int, int]:
+        """Build the changed cells for a division/day pair without writing them."""
+        try:
+            return self._plan_division_updates(day, division)
+        except Exception as e:
+            logger.error(f"Error updating {division} division for {day}: {e}", exc_info=True)
+            return [], 0, 0
+
+    def _plan_division_updates(self, day: str, division: str) -> Tuple[List[Dict], int, int]:
+        with REGISTRY.timer("mor_sync_phase_seconds", phase="plan", division=division, day=day):
+            return self._plan_pair(day, division)
+
+    def _plan_pair(self, day: str, division: str) -> Tuple[List[Dict], int, int]:
+        logger.info(f"Planning updates for {division} {day}")
+        division_values = self.get_cached_values(division)
+        division_formulas = self.cache.get(division, "formulas") if self.verifying else None
+        registry = self.get_team_registry()
+        division_table = registry.tables[division]
+
+        division_updates = []
+        skipped = 0
+
+        # Leg totals for every team on the day sheet, shared by both divisions
+        day_table, day_times = self.day_leg_times(day)
+        registry.unknown(day, day_table)
+
+        # Matches are reported over the whole day sheet, however few teams are replanned
+        division_teams = registry.by_division.get(division, {})
+        total_attempts = len(day_table)
+        matches_found = sum(1 for team_id in day_table.team_ids if team_id in division_teams)
+
+        dirty = self.dirty_teams.get(day)
+        if dirty is None:
+            positions = range(len(day_table))
+        else:
+            # Only teams with new or edited responses since the last sync
+            positions = sorted(pos for pos in map(day_table.position, dirty) if pos is not None)
+
+        replanned = 0
+        for pos in positions:
+            team_id = day_table.team_ids[pos]
+            entry = division_teams.get(team_id)
+            if entry is None:
+                continue
+
+            replanned += 1
+            times = day_times[pos]
+
+            if times:
+                for cell, row, col, value in self._row_cells(day, division, team_id, entry, times, division_table):
+                    # Only send cells that actually changed since the last run
+                    if self._cell_unchanged_at(division, division_values, cell, row, col, value, division_formulas):
+                        skipped += 1
+                    else:
+                        division_updates.append({'range': cell, 'values': [[value]]})
+
+        self.write_stats[(division, day)] = {'written': len(division_updates), 'skipped': skipped}
+        REGISTRY.inc("mor_cells_skipped_total", skipped, division=division, day=day)
+
+        logger.info(f"Planned {len(division_updates)} updates for {division} {day} ({replanned} teams replanned, {skipped} unchanged skipped): {matches_found}/{total_attempts} matches")
+        return division_updates, matches_found, total_attempts
+
+    def _run_plan(self, day: str, division: str) -> List[Dict]:
+        """Plan one pair, recording its outcome (or error) in task_results."""
+        try:
+            updates, matches, attempts = self._plan_division_updates(day, division)
+            self.task_results[(division, day)] = {'matches': matches, 'attempts': attempts, 'error': None}
+            return updates
+        except Exception as e:
+            logger.error(f"Error updating {division} division for {day}: {e}", exc_info=True)
+            self.task_results[(division, day)] = {'matches': 0, 'attempts': 0, 'error': str(e)}
+            return []
+
+    def plan_all(self) -> Dict[str, List[Dict]]:
+        """Plan every division/day pair; returns the changed cells per division."""
+        pending = {division: [] for division in self.divisions}
         for division in self.divisions:
-            results[division] = {}
             for day in self.days:
-                matches, attempts = self.update_division_times(day, division)
-                results[division][day] = (matches, attempts)
-                time.sleep(1)  # ratelimiting
-                
+                pending[division].extend(self._run_plan(day, division))
+        return pending
+
+    def plan_sync(self) -> WritePlan:
+        """Read the sheets and build everything a sync would write, without sending any of it."""
+        try:
+            self.prefetch_values()
+            self.task_results = {}
+            return WritePlan(self.plan_all())
+        finally:
+            # Nothing was written, so the next real sync must replan everything it just read
+            self._replan_all = True
+
+    def _sync_serial(self) -> int:
+        """Plan every pair, then send all of them in one combined write."""
+        try:
+            return self.write_updates(self.plan_all(), invalidate=False)
+        except Exception as e:
+            logger.error(f"Error writing division updates: {e}", exc_info=True)
+            for division in self.divisions:
+                for day in self.days:
+                    self.task_results[(division, day)]['error'] = str(e)
+            return 0
+
+    def _sync_concurrent(self, max_workers: int) -> int:
+        """Plan pairs on a thread pool and start writing each one as soon as it is ready."""
+        requests = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync") as pool:
+            plans = {
+                pool.submit(self._run_plan, day, division): (division, day)
+                for division in self.divisions
+                for day in self.days
+            }
+            writes = {}
+            for future in as_completed(plans):
+                division, day = plans[future]
+                updates = future.result()
+                if updates:
+                    writes[pool.submit(self.write_updates, {division: updates}, False)] = (division, day)
+
+            for future in as_completed(writes):
+                division, day = writes[future]
+                try:
+                    requests += future.result()
+                except Exception as e:
+                    logger.error(f"Error writing {division} division for {day}: {e}", exc_info=True)
+                    self.task_results[(division, day)]['error'] = str(e)
+        return requests
+
+    def update_all_divisions(self, max_workers: int = 1) -> Dict[str, Dict[str, Tuple[int, int]]]:
+        """Sync every division/day pair. With max_workers > 1 pairs run on a thread pool
+        sharing this manager's client and rate limiter."""
+        start = time.perf_counter()
+        try:
+            self.prefetch_values()
+            self.task_results = {}
+
+            if max_workers > 1:
+                requests = self._sync_concurrent(max_workers)
+            else:
+                requests = self._sync_serial()
+        except Exception:
+            # The day logs may already hold rows that were never written, so don't rely on them being done
+            self._replan_all = True
+            raise
+
+        results = {
+            division: {
+                day: (self.task_results[(division, day)]['matches'], self.task_results[(division, day)]['attempts'])
+                for day in self.days
+            }
+            for division in self.divisions
+        }
+
+        # The division sheets now hold what was just written
+        for division in self.divisions:
+            self.cache.invalidate(division, keep=("worksheet",))
+
+        self.last_sync_seconds = time.perf_counter() - start
+        written = sum(stats['written'] for stats in self.write_stats.values())
+        skipped = sum(stats['skipped'] for stats in self.write_stats.values())
+        errors = sum(1 for task in self.task_results.values() if task['error'])
+        if errors:
+            # Changes from this read may not have reached the sheet, so don't rely on them being done
+            self._replan_all = True
+        cache = self.cache.stats()
+        REGISTRY.observe("mor_sync_seconds", self.last_sync_seconds)
+        REGISTRY.inc("mor_sync_failed_tasks_total", errors)
+        REGISTRY.set("mor_sheet_cache_hit_ratio", cache['hit_ratio'])
+        REGISTRY.set("mor_sheet_cache_entries", cache['size'])
+        memo = self.row_memo.stats()
+        REGISTRY.set("mor_row_memo_hit_ratio", memo['hit_ratio'])
+        REGISTRY.set("mor_row_memo_entries", memo['size'])
+        REGISTRY.set("mor_row_memo_bytes", memo['bytes'])
+        logger.info(f"Sync complete in {self.last_sync_seconds:.2f}s: {written} cells written in {requests} requests, {skipped} unchanged cells skipped, {errors} failed tasks, cache hit ratio {cache['hit_ratio']:.0%}, row memo hit ratio {memo['hit_ratio']:.0%}")
         return results
 
-def test_relay_manager():
-    """Test the relay manager functionality."""
-    try:
-        manager = RelayManager()
-        print("✓ Successfully initialized RelayManager")
-        
-        manager.connect_sheets()
-        print("✓ Successfully connected to Google Sheets")
-
-        print("\nTesting all divisions and days...")
-        for division in ["Open", "Mixed"]:
-            print(f"\n{division} Division:")
-            for day in ["Day1", "Day2", "Day3"]:
-                matches, attempts = manager.update_division_times(day, division)
-                print(f"  {day}: {matches}/{attempts} matches")
-                time.sleep(1) # ratelimiting
-        
-        # Test single update
-        #print("\nTesting single division update...")
-        #matches, attempts = manager.update_division_times("Day1", "Open")
-        #print(f"Day1 Open division: {matches}/{attempts} matches")
-        
-        print("\nAll tests completed successfully!")
-        
-    except Exception as e:
-        print(f"❌ Error during testing: {e}")
+def dry_run(manager: Optional[RelayManager] = None):
+    """Print what a sync would write and what it would cost, without writing anything."""
+    manager = manager or RelayManager()
+    manager.connect_sheets()
+    plan = manager.plan_sync()
+    write_bucket = manager.rate_limiter.buckets['write']
+    print(plan.describe(write_bucket.tokens, write_bucket.capacity))
 
 if __name__ == "__main__":
-    test_relay_manager()
\ No newline at end of file
+    # mor.py is the entry point; this keeps `python function.py [--dry-run]` working
+    import sys
+    from mor import main
+    main(["sync"] + sys.argv[1:])
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are gzip-only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 512
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+class ResponseCache:
+    """Rendered and compressed response bodies for the current snapshot version.
+
+    Each (key, encoding) is rendered and compressed once per generation; a new
+    generation (snapshot version) drops everything cached for the old one.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._generation = None
+        self._bodies: Dict[Hashable, Tuple[bytes, str]] = {}  # key -> (body, content hash)
+        self._encoded: "OrderedDict[Tuple[Hashable, Optional[str]], Tuple[bytes, str, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, generation, key: Hashable, encoding: Optional[str], build: Callable[[], bytes],
+            content: Optional[Callable[[], bytes]] = None) -> Tuple[bytes, str, Optional[str]]:
+        """Encoded body, its ETag and the encoding actually used, building it on a miss.
+
+        The ETag hashes `content()` when given, otherwise the body. Pass the
+        body without per-process fields (fetch time, snapshot version) so
+        every instance serving the same standings sends the same tag.
+        """
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._bodies.clear()
+                self._encoded.clear()
+            cached = self._encoded.get((key, encoding))
+            if cached is not None:
+                self._encoded.move_to_end((key, encoding))
+                return cached
+            built = self._bodies.get(key)
+
+        if built is None:
+            body = build()
+            # The tag hashes the content, so instances that built the same data agree
+            built = (body, hashlib.sha1(content() if content is not None else body).hexdigest()[:20])
+        body, digest = built
+        used = encoding if len(body) >= MIN_COMPRESS_BYTES else None
+        etag = digest + (f"-{used}" if used else "")
+        entry = (compress(body, used), etag, used)
+
+        with self._lock:
+            if generation == self._generation:
+                self._bodies[key] = built
+                self._encoded[(key, encoding)] = entry
+                while len(self._encoded) > self.max_entries:
+                    (old_key, _), _ = self._encoded.popitem(last=False)
+                    if not any(k == old_key for k, _ in self._encoded):
+                        self._bodies.pop(old_key, None)
+        return entry
+
+def cached_response(cache: ResponseCache, generation, key: Hashable, build: Callable[[], bytes],
+                    mimetype: str, last_modified: Optional[float], cache_control: str,
+                    content: Optional[Callable[[], bytes]] = None) -> Response:
+    """Conditional, compressed response: 304 when the client's copy is current."""
+    encoding = request.accept_encodings.best_match(available_encodings())
+    body, etag, encoding = cache.get(generation, key, encoding, build, content)
+
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response.make_conditional(request)
@@ -0,0 +1,73 @@
+import hashlib
+from typing import List, Optional, Set
+
+FIRST_RESPONSE_ROW = 3  # Rows 1-2 of a day sheet are headers
+
+def row_hash(row: List[str]) -> bytes:
+    return hashlib.blake2b("\x1f".join(row).encode(), digest_size=8).digest()
+
+class DayLog:
+    """What has been read so far of one append-only form response sheet.
+
+    The high-water mark is the last sheet row read. Tail reads start at that
+    row again so its hash can confirm nothing above it moved; a mismatch, or
+    every `verify_every`th sync, means the whole sheet is read and re-hashed.
+    """
+
+    def __init__(self, team_col: int):
+        self.team_col = team_col
+        self.rows: List[List[str]] = []
+        self.hashes: List[bytes] = []
+        self.last_timestamp: Optional[str] = None
+        self.syncs_since_verify = 0
+
+    @property
+    def high_water(self) -> int:
+        return len(self.rows)
+
+    def can_tail(self, verify_every: int) -> bool:
+        """Whether the next read can be tail-only; every `verify_every`th read is a full one."""
+        return self.high_water >= FIRST_RESPONSE_ROW and self.syncs_since_verify + 1 < verify_every
+
+    def _team_id(self, row: List[str]) -> Optional[str]:
+        team_id = row[self.team_col].strip() if self.team_col < len(row) else ""
+        return team_id or None
+
+    def _teams(self, rows: List[List[str]], first_index: int) -> Set[str]:
+        """Team ids on response rows, skipping the header rows."""
+        teams = set()
+        for i, row in enumerate(rows, start=first_index):
+            if i >= FIRST_RESPONSE_ROW - 1:
+                teams.add(self._team_id(row))
+        teams.discard(None)
+        return teams
+
+    def _advance(self, rows: List[List[str]], hashes: List[bytes]):
+        self.rows = rows
+        self.hashes = hashes
+        self.last_timestamp = rows[-1][0] if rows and rows[-1] else None
+
+    def apply_tail(self, values: List[List[str]], start_row: int) -> Optional[Set[str]]:
+        """Append rows read from start_row on; returns their team ids, or None if the overlap row changed."""
+        if start_row != self.high_water or not values or row_hash(values[0]) != self.hashes[-1]:
+            return None
+        new_rows = values[1:]
+        self.syncs_since_verify += 1
+        if new_rows:
+            # A new list, so caches keyed on the values object notice the change
+            self._advance(self.rows + new_rows, self.hashes + [row_hash(row) for row in new_rows])
+        return self._teams(new_rows, self.high_water - len(new_rows))
+
+    def apply_full(self, values: List[List[str]]) -> Set[str]:
+        """Replace everything read so far; returns team ids on new, edited or removed rows."""
+        hashes = [row_hash(row) for row in values]
+        changed = set()
+        for i, digest in enumerate(hashes):
+            if i >= len(self.hashes) or self.hashes[i] != digest:
+                changed |= self._teams([values[i]], i)
+                if i < len(self.rows):
+                    changed |= self._teams([self.rows[i]], i)
+        changed |= self._teams(self.rows[len(values):], len(values))
+        self.syncs_since_verify = 0
+        self._advance(values, hashes)
+        return changed
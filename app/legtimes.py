@@ -0,0 +1,138 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Code points used by the vectorized h:mm:ss / hh:mm:ss fast path
+_ZERO = ord('0')
+_COLON = ord(':')
+
+def time_str_to_decimal(time_str: str) -> Optional[float]:
+    """Parse h:mm:ss into decimal hours, or None if it isn't a time. The reference for leg times."""
+    try:
+        if not time_str or not time_str.strip():
+            return None
+
+        parts = time_str.split(':')
+        if len(parts) != 3:
+            return None
+
+        hours = float(parts[0])
+        minutes = float(parts[1])
+        seconds = float(parts[2])
+
+        return hours + (minutes / 60) + (seconds / 3600)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+def time_str_to_seconds(time_str: str) -> Optional[int]:
+    """Parse h:mm:ss into whole seconds, or None if it isn't a time."""
+    try:
+        if not time_str or not time_str.strip():
+            return None
+
+        parts = time_str.split(':')
+        if len(parts) != 3:
+            return None
+
+        return int(round(float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])))
+    except (ValueError, TypeError, OverflowError, AttributeError):
+        return None
+
+def _parse_fixed_width(codes: np.ndarray, lengths: np.ndarray, hour_digits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized parse of cells shaped like h:mm:ss (hour_digits=1) or hh:mm:ss (2).
+
+    Returns the indexes of matching cells and their durations in decimal
+    hours, computed exactly as time_str_to_decimal does.
+    """
+    width = hour_digits + 6
+    candidates = np.flatnonzero(lengths == width)
+    if codes.shape[1] < width or not len(candidates):
+        return candidates[:0], np.zeros(0, dtype=np.float64)
+
+    block = codes[candidates, :width]
+    colons = (hour_digits, hour_digits + 3)
+    matches = np.ones(len(candidates), dtype=bool)
+    digits = {}
+    for i in range(width):
+        if i in colons:
+            matches &= block[:, i] == _COLON
+        else:
+            # Unsigned subtraction wraps for anything below '0', so one compare covers both ends
+            digits[i] = block[:, i] - _ZERO
+            matches &= digits[i] < 10
+
+    hours = digits[0] if hour_digits == 1 else digits[0] * 10 + digits[1]
+    minutes = digits[hour_digits + 1] * 10 + digits[hour_digits + 2]
+    seconds = digits[hour_digits + 4] * 10 + digits[hour_digits + 5]
+    # Same float operations, in the same order, as the scalar parser
+    total = hours.astype(np.float64) + (minutes / 60) + (seconds / 3600)
+    return candidates[matches], total[matches]
+
+def parse_leg_block(rows: List[List[str]], begin_idx: int, end_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse a sheet's leg columns into per-leg decimal hours and a validity mask.
+
+    Returns an (n_rows, n_legs) float64 array of durations and a matching bool
+    mask. Cells that aren't plain h:mm:ss fall back to time_str_to_decimal, so
+    the result is identical to parsing every cell one at a time.
+    """
+    n_legs = end_idx - begin_idx + 1
+    cells = []
+    for row in rows:
+        legs = row[begin_idx:end_idx + 1]
+        cells.extend(legs)
+        if len(legs) < n_legs:
+            cells.extend([""] * (n_legs - len(legs)))
+
+    hours = np.zeros(len(cells), dtype=np.float64)
+    valid = np.zeros(len(cells), dtype=bool)
+    if cells:
+        # One row of UTF-32 code points per cell, zero padded to the longest cell
+        codes = np.array(cells, dtype=str).view(np.uint32).reshape(len(cells), -1)
+        lengths = (codes != 0).sum(axis=1)
+
+        for hour_digits in (1, 2):
+            matched, parsed = _parse_fixed_width(codes, lengths, hour_digits)
+            hours[matched] = parsed
+            valid[matched] = True
+
+        # Anything unusual (spaces, fractions, 3-digit hours, junk) takes the scalar path
+        for i in np.flatnonzero(~valid & (lengths > 0)):
+            value = time_str_to_decimal(cells[i])
+            if value is not None:
+                hours[i] = value
+                valid[i] = True
+
+    return hours.reshape(len(rows), n_legs), valid.reshape(len(rows), n_legs)
+
+def leg_totals(hours: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Total hours per row, and whether the row had any valid leg.
+
+    Legs are added one column at a time, left to right, so each total is
+    bit-for-bit the sum() of that row's legs rather than a pairwise sum.
+    """
+    totals = np.zeros(hours.shape[0], dtype=np.float64)
+    for leg in range(hours.shape[1]):
+        totals += np.where(valid[:, leg], hours[:, leg], 0.0)
+    return totals, valid.any(axis=1)
+
+def format_seconds(seconds: np.ndarray, pad_hours: bool = False) -> List[str]:
+    """Format whole seconds as h:mm:ss (or hh:mm:ss) strings, column-wise."""
+    hours, remainder = np.divmod(np.asarray(seconds, dtype=np.int64), 3600)
+    minutes, secs = np.divmod(remainder, 60)
+    hour_format = "{:02d}" if pad_hours else "{}"
+    return [
+        f"{hour_format.format(h)}:{m:02d}:{s:02d}"
+        for h, m, s in zip(hours.tolist(), minutes.tolist(), secs.tolist())
+    ]
+
+def format_hours(hours: np.ndarray, pad_hours: bool = False) -> List[str]:
+    """Format finite, non-negative decimal hours as h:mm:ss.
+
+    Hours, minutes and seconds are each truncated on their own, exactly as
+    elapsed times have always been written, so float error in a sum can
+    still drop a second (RelayManager.decimal_to_time_str corrects that).
+    """
+    hours = np.asarray(hours, dtype=np.float64)
+    minutes = np.trunc(np.mod(hours * 60, 60)).astype(np.int64)
+    secs = np.trunc(np.mod(hours * 3600, 60)).astype(np.int64)
+    return format_seconds(np.trunc(hours).astype(np.int64) * 3600 + minutes * 60 + secs, pad_hours)
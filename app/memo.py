@@ -0,0 +1,81 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from ingest import row_hash
+
+# A formula-mode row is about 2KB, so 64MB holds every team and day of a ~10,000 team race
+MAX_BYTES = 64 * 1024 * 1024
+
+def approx_size(value: Any) -> int:
+    """Bytes held by a value, following tuples and lists (what planned rows are made of)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+class RowMemo:
+    """LRU of per-row results bounded by approximate size, keyed by a hash of everything the result depends on.
+
+    Between syncs almost every row is unchanged, so its planned cells can be
+    reused instead of rebuilt. Keys come from key(), which hashes the row's
+    inputs (leg time, team id, handicap, ...) into 8 bytes; anything not in
+    the key must stay fixed until clear() is called.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[bytes, Tuple[Any, int]]" = OrderedDict()  # key -> (value, approx bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(*parts) -> bytes:
+        return row_hash([str(part) for part in parts])
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, value: Any):
+        size = approx_size(key) + approx_size(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'bytes': self.bytes
+            }
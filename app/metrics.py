@@ -0,0 +1,135 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Name -> (type, help) for everything the app records
+METRICS = {
+    "mor_sync_phase_seconds": ("summary", "Time spent in each sync phase (fetch, parse, plan, write)"),
+    "mor_sync_seconds": ("summary", "Duration of whole syncs"),
+    "mor_sync_failed_tasks_total": ("counter", "Division/day pairs that failed during a sync"),
+    "mor_cells_written_total": ("counter", "Cells sent to the sheet"),
+    "mor_cells_skipped_total": ("counter", "Planned cells skipped because the sheet already had them"),
+    "mor_sheets_api_requests_total": ("counter", "Sheets API requests by operation"),
+    "mor_sheets_api_errors_total": ("counter", "Sheets API requests that raised"),
+    "mor_sheets_api_seconds": ("summary", "Sheets API latency by operation"),
+    "mor_rate_limiter_wait_seconds_total": ("counter", "Time spent waiting for rate limiter tokens"),
+    "mor_rate_limiter_throttled_total": ("counter", "Quota errors that triggered a backoff"),
+    "mor_sheet_cache_hit_ratio": ("gauge", "Sheet cache hits / lookups at the end of the last sync"),
+    "mor_sheet_cache_entries": ("gauge", "Entries in the sheet cache at the end of the last sync"),
+    "mor_row_memo_hit_ratio": ("gauge", "Planned rows reused from the row memo / rows planned"),
+    "mor_row_memo_entries": ("gauge", "Rows held in the row memo"),
+    "mor_row_memo_bytes": ("gauge", "Approximate memory held by the row memo"),
+    "mor_leaderboard_refresh_seconds": ("summary", "Time to fetch and rebuild the leaderboard snapshot"),
+    "mor_leaderboard_snapshot_age_seconds": ("gauge", "Seconds since the leaderboard snapshot was fetched"),
+    "mor_leaderboard_snapshot_version": ("gauge", "Leaderboard snapshot version"),
+    "mor_startup_seconds": ("gauge", "Time from loading mor.py until the command was ready"),
+    "mor_startup_import_seconds": ("gauge", "Part of the startup time spent importing the command's modules"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and timing summaries in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._summaries: Dict[str, Dict[Labels, list]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values.setdefault(name, {})[_labels(labels)] = float(value)
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            summary = self._summaries.setdefault(name, {}).setdefault(key, [0, 0.0])
+            summary[0] += 1
+            summary[1] += seconds
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe how long the block took, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels) -> float:
+        """Current counter/gauge value, or a summary's count; 0 if never recorded."""
+        key = _labels(labels)
+        with self._lock:
+            if name in self._summaries:
+                return self._summaries[name].get(key, [0, 0.0])[0]
+            return self._values.get(name, {}).get(key, 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._summaries.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(set(self._values) | set(self._summaries)):
+                metric_type, help_text = METRICS.get(name, ("untyped", ""))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in sorted(self._values.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:.10g}")
+                for labels, (count, total) in sorted(self._summaries.get(name, {}).items()):
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+def start_http_server(port: int, host: str = "", registry: Optional[MetricsRegistry] = None):
+    """Serve `registry` at /metrics from a daemon thread, for processes without the Flask app.
+
+    Returns the server; its shutdown() stops the thread.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would otherwise log a line every few seconds
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,134 @@
+"""Command line entry point: python mor.py {sync,serve,export,bench} [options]
+
+Only argparse and the standard library load up front; each command imports
+the modules it needs, so e.g. `serve` never loads the sync machinery. Every
+command reports how long it took to get ready and how much of that was
+imports, to keep an eye on cold starts.
+"""
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from typing import List, Optional
+
+class Startup:
+    """Time spent importing and getting ready, measured from when this module loaded."""
+
+    def __init__(self, started: float = _STARTED):
+        self.started = started
+        self.import_seconds = 0.0
+        self.ready_seconds: Optional[float] = None
+
+    @contextmanager
+    def importing(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.import_seconds += time.perf_counter() - start
+
+    def ready(self, command: str):
+        """Report startup time once the command is about to do its real work."""
+        from metrics import REGISTRY
+
+        self.ready_seconds = time.perf_counter() - self.started
+        REGISTRY.set("mor_startup_seconds", self.ready_seconds, command=command)
+        REGISTRY.set("mor_startup_import_seconds", self.import_seconds, command=command)
+        print(f"mor {command}: ready in {self.ready_seconds * 1000:.0f} ms "
+              f"({self.import_seconds * 1000:.0f} ms importing)", file=sys.stderr)
+
+def sync(args, startup: Startup):
+    with startup.importing():
+        from function import RelayManager, dry_run
+        from syncservice import SyncService, sync_callback
+
+    manager = RelayManager()
+    startup.ready("sync")
+    if args.dry_run:
+        dry_run(manager)
+        return
+
+    service = SyncService(manager, max_workers=args.workers, on_sync=sync_callback(manager))
+    if args.watch:
+        if args.metrics_port:
+            # Sync metrics only exist in this process, so serve them from here
+            from metrics import start_http_server
+            start_http_server(args.metrics_port)
+        service.start(blocking=True)
+    else:
+        record = service.run_once(force=True)
+        if record['outcome'] == 'failed':
+            sys.exit(1)
+
+def serve(args, startup: Startup):
+    with startup.importing():
+        import server
+
+    startup.ready("serve")
+    server.app.run(host=args.host, port=args.port, debug=args.debug)
+
+def export(args, startup: Startup):
+    with startup.importing():
+        from function import RelayManager
+        from syncservice import SNAPSHOT_PATH, publish
+
+    manager = RelayManager()
+    startup.ready("export")
+    manager.connect_sheets()
+    result = publish(manager, SNAPSHOT_PATH if args.snapshot else "", args.output)
+    print(f"Exported to {args.output}: {result['written']} files written, {result['unchanged']} unchanged")
+
+def bench(args, startup: Startup):
+    with startup.importing():
+        import benchmark
+
+    startup.ready("bench")
+    benchmark.main(args.extra)
+
+def _default_publish_dir() -> str:
+    # Same as staticexport.DEFAULT_PUBLISH_DIR, without importing it just to build the parser
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "public")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mor", description="Sheet sync, leaderboard server and tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="sync form responses into the division sheets")
+    sync_parser.add_argument("--dry-run", action="store_true", help="print the write plan and its cost without writing")
+    sync_parser.add_argument("--watch", action="store_true", help="keep syncing every UPDATE_INTERVAL_MINUTES")
+    sync_parser.add_argument("--workers", type=int, default=int(os.getenv('SYNC_WORKERS', 1)))
+    sync_parser.add_argument("--metrics-port", type=int, default=int(os.getenv('METRICS_PORT') or 0),
+                             help="with --watch, serve /metrics on this port (default METRICS_PORT, 0 disables)")
+    sync_parser.set_defaults(func=sync)
+
+    serve_parser = commands.add_parser("serve", help="run the leaderboard server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=int(os.getenv('PORT', 5000)))
+    serve_parser.add_argument("--debug", action="store_true")
+    serve_parser.set_defaults(func=serve)
+
+    export_parser = commands.add_parser("export", help="render the static leaderboard site from the current standings")
+    export_parser.add_argument("--output", default=os.getenv('PUBLISH_DIR') or _default_publish_dir(),
+                               help="publish directory (default: the repo's public/)")
+    export_parser.add_argument("--snapshot", action="store_true", help="also save the standings snapshot")
+    export_parser.set_defaults(func=export)
+
+    bench_parser = commands.add_parser("bench", help="run benchmark.py, passing on any other arguments")
+    bench_parser.set_defaults(func=bench)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> Startup:
+    parser = build_parser()
+    args, args.extra = parser.parse_known_args(argv)
+    if args.extra and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(args.extra)}")
+    startup = Startup()
+    args.func(args, startup)
+    return startup
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import json
+from typing import Dict, List, Optional
+
+from a1 import a1_to_rowcol, absolute_range_name, rowcol_to_a1
+from ratelimit import WRITE_REQUESTS_PER_MINUTE
+
+# Google recommends keeping a single values request under 2 MB
+MAX_BATCH_BYTES = 2_000_000
+
+def coalesce_updates(updates: List[Dict]) -> List[Dict]:
+    """Merge single-cell updates into row spans, then into rectangular blocks."""
+    cells = {}
+    for update in updates:
+        cells[a1_to_rowcol(update['range'])] = update['values'][0][0]
+
+    # Adjacent columns within a row become one span
+    spans = []
+    for row, col in sorted(cells):
+        if spans and spans[-1][0] == row and spans[-1][2] == col - 1:
+            spans[-1][2] = col
+            spans[-1][3].append(cells[(row, col)])
+        else:
+            spans.append([row, col, col, [cells[(row, col)]]])
+
+    # Spans covering the same columns on consecutive rows become one block
+    blocks = []
+    for row, start_col, end_col, values in sorted(spans, key=lambda span: (span[1], span[2], span[0])):
+        last = blocks[-1] if blocks else None
+        if last and (last[1], last[2]) == (start_col, end_col) and last[3] == row - 1:
+            last[3] = row
+            last[4].append(values)
+        else:
+            blocks.append([row, start_col, end_col, row, [values]])
+
+    merged = []
+    for first_row, start_col, end_col, last_row, values in sorted(blocks):
+        cell_range = rowcol_to_a1(first_row, start_col)
+        if (first_row, start_col) != (last_row, end_col):
+            cell_range += f":{rowcol_to_a1(last_row, end_col)}"
+        merged.append({'range': cell_range, 'values': values})
+    return merged
+
+def to_batch_data(updates_by_sheet: Dict[str, List[Dict]]) -> List[Dict]:
+    """Flatten per-sheet updates into spreadsheet-level ranges."""
+    data = []
+    for sheet_name, updates in updates_by_sheet.items():
+        for update in updates:
+            data.append({
+                'range': absolute_range_name(sheet_name, update['range']),
+                'values': update['values']
+            })
+    return data
+
+def update_size(update: Dict) -> int:
+    """Approximate number of bytes an update adds to the request body."""
+    return len(json.dumps(update))
+
+def chunk_updates(data: List[Dict], max_bytes: int = MAX_BATCH_BYTES) -> List[List[Dict]]:
+    """Split ranges into as few batches as the payload limit allows."""
+    batches = []
+    current = []
+    current_size = 0
+    for update in data:
+        size = update_size(update)
+        if current and current_size + size > max_bytes:
+            batches.append(current)
+            current = []
+            current_size = 0
+        current.append(update)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+def _format_bytes(size: int) -> str:
+    return f"{size / 1_000_000:.1f} MB" if size >= 1_000_000 else f"{size / 1000:.1f} KB"
+
+class WritePlan:
+    """The batch requests a set of planned cell updates turns into, and what sending them costs.
+
+    Ranges are merged by coalesce_updates and packed into as few requests as
+    the payload limit allows; cost() compares the request count with the
+    write quota left so a sync can be checked before anything is sent.
+    """
+
+    def __init__(self, updates_by_sheet: Dict[str, List[Dict]], max_bytes: int = MAX_BATCH_BYTES):
+        self.updates_by_sheet = {sheet: updates for sheet, updates in updates_by_sheet.items() if updates}
+        self.data = to_batch_data({
+            sheet: coalesce_updates(updates) for sheet, updates in self.updates_by_sheet.items()
+        })
+        self.batches = chunk_updates(self.data, max_bytes)
+        self.batch_bytes = [sum(update_size(update) for update in batch) for batch in self.batches]
+
+    def __bool__(self) -> bool:
+        return bool(self.batches)
+
+    def cost(self, tokens_available: Optional[float] = None,
+             per_minute: int = WRITE_REQUESTS_PER_MINUTE) -> Dict:
+        """Requests, ranges, cells and bytes to send, plus the expected wait for write quota."""
+        tokens = per_minute if tokens_available is None else tokens_available
+        requests = len(self.batches)
+        return {
+            'requests': requests,
+            'ranges': len(self.data),
+            'cells': sum(len(updates) for updates in self.updates_by_sheet.values()),
+            'bytes': sum(self.batch_bytes),
+            'cells_by_sheet': {sheet: len(updates) for sheet, updates in self.updates_by_sheet.items()},
+            'quota_wait_seconds': max(requests - tokens, 0) * 60.0 / per_minute
+        }
+
+    def describe(self, tokens_available: Optional[float] = None,
+                 per_minute: int = WRITE_REQUESTS_PER_MINUTE) -> str:
+        """Human-readable summary of the plan, one line per sheet and batch."""
+        cost = self.cost(tokens_available, per_minute)
+        lines = [f"{cost['requests']} write requests, {cost['ranges']} ranges, "
+                 f"{cost['cells']} cells, {_format_bytes(cost['bytes'])}"]
+        lines += [f"  {sheet}: {cells} cells" for sheet, cells in cost['cells_by_sheet'].items()]
+        lines += [f"  batch {i}: {len(batch)} ranges, {_format_bytes(size)}"
+                  for i, (batch, size) in enumerate(zip(self.batches, self.batch_bytes), start=1)]
+        if cost['quota_wait_seconds'] > 0:
+            lines.append(f"Exceeds the write quota left this minute, expect ~{cost['quota_wait_seconds']:.0f}s of waiting")
+        elif cost['requests']:
+            lines.append(f"Fits in the write quota ({per_minute} requests per minute)")
+        else:
+            lines.append("Nothing to write")
+        return "\n".join(lines)
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from a1 import a1_to_rowcol, rowcol_to_a1
+from legtimes import parse_leg_block, time_str_to_seconds
+
+DAYS = ["Day1", "Day2", "Day3"]
+DIVISIONS = ["Open", "Mixed"]
+DIVISION_TEAM_COLUMN = "B"  # Team number on the Open/Mixed sheets
+TIME_RESULTS = ["act", "hc", "tact", "thc"]  # Result columns that hold durations rather than paces
+
+def column_index(letter: str) -> int:
+    """Convert a column letter (A, F, AB) to a 0-based index."""
+    return a1_to_rowcol(f"{letter.upper()}1")[1] - 1
+
+def column_letter(index: int) -> str:
+    """Convert a 0-based column index back to its letter."""
+    return rowcol_to_a1(1, index + 1)[:-1]
+
+def _cell(row: List[str], idx: int) -> str:
+    return row[idx].strip() if idx < len(row) else ""
+
+class RaceTable:
+    """Columnar view of a day or division sheet, parsed once.
+
+    Each team is a position in parallel arrays: ``team_ids[i]`` sits on sheet
+    row ``row_numbers[i]``. Day tables carry ``leg_hours``/``leg_valid``;
+    division tables carry ``names``, ``handicaps`` (NaN when missing) and
+    ``results`` (seconds per result column, -1 when blank).
+    """
+
+    __slots__ = ("team_ids", "row_numbers", "names", "handicaps", "leg_hours", "leg_valid", "results", "_index")
+
+    def __init__(self, team_ids: List[str], row_numbers: List[int]):
+        self.team_ids = team_ids
+        self.row_numbers = np.asarray(row_numbers, dtype=np.int32)
+        self.names: Optional[List[str]] = None
+        self.handicaps: Optional[np.ndarray] = None
+        self.leg_hours: Optional[np.ndarray] = None
+        self.leg_valid: Optional[np.ndarray] = None
+        self.results: Dict[str, np.ndarray] = {}
+        # Later rows win, matching how repeated team ids were handled before
+        self._index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+    def __len__(self) -> int:
+        return len(self.team_ids)
+
+    def __contains__(self, team_id: str) -> bool:
+        return team_id in self._index
+
+    def position(self, team_id: str) -> Optional[int]:
+        """Array position of a team, or None if it isn't on this sheet."""
+        return self._index.get(team_id)
+
+    def row_of(self, team_id: str) -> Optional[int]:
+        """1-based sheet row of a team."""
+        pos = self._index.get(team_id)
+        return None if pos is None else int(self.row_numbers[pos])
+
+    def handicap(self, team_id: str) -> Optional[float]:
+        """Parsed handicap factor, or None if missing or invalid."""
+        pos = self._index.get(team_id)
+        if pos is None or self.handicaps is None or np.isnan(self.handicaps[pos]):
+            return None
+        return float(self.handicaps[pos])
+
+    @classmethod
+    def from_day_values(cls, values: List[List[str]], config: Dict) -> "RaceTable":
+        """Parse a form response sheet (data from row 3) into team ids and leg seconds."""
+        timesheet_config = config['timesheet']
+        team_col = timesheet_config.get("raceNumber", 2)
+
+        rows = []
+        team_ids = []
+        row_numbers = []
+        for row_number, row in enumerate(values[2:], start=3):
+            team_id = _cell(row, team_col)
+            if team_id:
+                rows.append(row)
+                team_ids.append(team_id)
+                row_numbers.append(row_number)
+
+        table = cls(team_ids, row_numbers)
+        hours, valid = parse_leg_block(
+            rows,
+            column_index(timesheet_config["legBegin"]),
+            column_index(timesheet_config["legEnd"])
+        )
+        table.leg_hours = hours
+        table.leg_valid = valid
+        return table
+
+    @classmethod
+    def from_division_values(cls, values: List[List[str]], config: Dict) -> "RaceTable":
+        """Parse an Open/Mixed sheet (data from row 2) into ids, names, handicaps and results."""
+        team_col = column_index(DIVISION_TEAM_COLUMN)
+        name_col = ord(config['teamName']) - 97  # teamName is a lowercase letter
+        handicap_col = column_index(config.get("handicapFactor", "D"))
+        result_cols = {config['actMatchLetter']}
+        for day in DAYS:
+            result_cols.update(config[day][key] for key in TIME_RESULTS if key in config[day])
+
+        team_ids = []
+        row_numbers = []
+        names = []
+        handicaps = []
+        results = {col: [] for col in result_cols}
+        result_idx = {col: column_index(col) for col in result_cols}
+        for row_number, row in enumerate(values[1:], start=2):
+            team_id = _cell(row, team_col)
+            if not team_id:
+                continue
+            team_ids.append(team_id)
+            row_numbers.append(row_number)
+            names.append(_cell(row, name_col))
+            try:
+                handicaps.append(float(_cell(row, handicap_col)))
+            except ValueError:
+                handicaps.append(np.nan)
+            for col, column in results.items():
+                seconds = time_str_to_seconds(_cell(row, result_idx[col]))
+                column.append(-1 if seconds is None else seconds)
+
+        table = cls(team_ids, row_numbers)
+        table.names = names
+        table.handicaps = np.asarray(handicaps, dtype=np.float64)
+        table.results = {col: np.asarray(column, dtype=np.int32) for col, column in results.items()}
+        return table
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Google Sheets allows 60 read and 60 write requests per minute per user
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
+def is_quota_error(error: Exception) -> bool:
+    """True for 429 / quota-exceeded responses from the Sheets API."""
+    code = getattr(error, 'code', None)
+    response = getattr(error, 'response', None)
+    if code is None and response is not None:
+        code = getattr(response, 'status_code', None)
+    if code == 429:
+        return True
+    message = str(error)
+    return "RESOURCE_EXHAUSTED" in message or "Quota exceeded" in message
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` tokens per `period` seconds.
+
+    Callers reserve a token under the lock and sleep outside it, so the bucket
+    can go negative: that is the queue of callers already waiting their turn.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take tokens and return how long the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block the calling thread until tokens are available; returns time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 1) -> float:
+        """asyncio version of acquire that doesn't block the event loop."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def block_for(self, seconds: float):
+        """Hold every caller back for `seconds`, e.g. after the API pushed back."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available (negative when callers are queued)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def wait_time(self) -> float:
+        """Seconds a new caller would have to wait right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            return max(wait, self._blocked_until - now)
+
+class RateLimiter:
+    """Separate read and write token buckets matching the Sheets per-minute quotas."""
+
+    def __init__(self, read_per_minute: int = READ_REQUESTS_PER_MINUTE,
+                 write_per_minute: int = WRITE_REQUESTS_PER_MINUTE,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 64.0):
+        self.buckets = {
+            'read': TokenBucket(read_per_minute),
+            'write': TokenBucket(write_per_minute)
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_wait = 0.0
+        self.throttled = 0
+        self._stats_lock = threading.Lock()
+
+    def _record_wait(self, wait: float, kind: str):
+        if wait > 0:
+            with self._stats_lock:
+                self.total_wait += wait
+            REGISTRY.inc("mor_rate_limiter_wait_seconds_total", wait, kind=kind)
+
+    def wait_if_needed(self, kind: str = 'read') -> float:
+        """Block until a request of this kind is allowed; returns time waited."""
+        wait = self.buckets[kind].reserve()
+        if wait > 0:
+            logger.info(f"Rate limit reached, waiting {wait:.2f} seconds")
+            time.sleep(wait)
+        self._record_wait(wait, kind)
+        return wait
+
+    async def wait_async(self, kind: str = 'read') -> float:
+        wait = await self.buckets[kind].acquire_async()
+        self._record_wait(wait, kind)
+        return wait
+
+    def backoff(self, kind: str, attempt: int) -> float:
+        """Exponential backoff with jitter, applied to every user of the bucket."""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        self.buckets[kind].block_for(delay)
+        with self._stats_lock:
+            self.throttled += 1
+        REGISTRY.inc("mor_rate_limiter_throttled_total", kind=kind)
+        return delay
+
+    def call(self, func: Callable, *args, kind: str = 'read', **kwargs):
+        """Run an API call under the limiter, retrying when the quota is exceeded."""
+        for attempt in range(self.max_retries + 1):
+            self.wait_if_needed(kind)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e) or attempt == self.max_retries:
+                    raise
+                delay = self.backoff(kind, attempt)
+                logger.warning(f"Sheets {kind} quota exceeded, backing off {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Current tokens and wait time per bucket, for monitoring."""
+        return {
+            kind: {'tokens': bucket.tokens, 'wait_seconds': bucket.wait_time()}
+            for kind, bucket in self.buckets.items()
+        }
@@ -1,51 +1,261 @@
-from flask import Flask, render_template
-import gspread
+from flask import Flask, Response, jsonify, render_template, request
+from datetime import datetime
 import json
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from a1 import fill_gaps
+from backend import create_backend
+from httpcache import ResponseCache, cached_response
+from metrics import REGISTRY
+from racetable import DIVISIONS
+from settings import CONFIG_PATH, load_config
+from snapshot import LeaderboardSnapshot, load_snapshot, save_snapshot
+from standings import RANKINGS, build_standings
+from stream import DeltaBroker
 
 load_dotenv()
 
 app = Flask(__name__)
 
-def get_google_sheet():
-    creds_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
-    if not creds_json:
-        raise ValueError("GOOGLE_CREDENTIALS_JSON environment variable is not set")
-    
-    creds_dict = json.loads(creds_json)
-    gc = gspread.service_account_from_dict(creds_dict)
-    return gc.open("Relay Data").worksheet("Open")
+AUTO_UPDATE_ENABLED = os.getenv('AUTO_UPDATE_ENABLED', 'true').lower() == 'true'
+UPDATE_INTERVAL_MINUTES = float(os.getenv('UPDATE_INTERVAL_MINUTES', 5))
+# Last good standings on disk, loaded at startup; empty disables saving and loading
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'leaderboard_snapshot.npz')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Browsers revalidate every time (cheap 304s); a CDN such as Vercel's may
+# serve its copy for CDN_MAX_AGE seconds and a stale one while it refetches.
+CDN_MAX_AGE = int(os.getenv('CDN_MAX_AGE', 30))
+CACHE_CONTROL = (
+    f"public, max-age=0, s-maxage={CDN_MAX_AGE}, "
+    f"stale-while-revalidate={int(UPDATE_INTERVAL_MINUTES * 60)}"
+)
+
+config = load_config(CONFIG_PATH)
+
+snapshot = LeaderboardSnapshot()
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_responses = ResponseCache()
+broker = DeltaBroker()
+HEARTBEAT_SECONDS = 15
+RECONNECT_MS = 3000
+# Streams are closed periodically so workers recycle; EventSource reconnects
+# with Last-Event-ID and picks up where it left off
+STREAM_MAX_SECONDS = float(os.getenv('STREAM_MAX_SECONDS', 300))
+_backend = None
+
+def get_backend():
+    """Open the configured sheet backend (SHEET_BACKEND) once per process."""
+    global _backend
+    if _backend is None:
+        backend = create_backend()
+        backend.open("Relay Data")
+        _backend = backend
+    return _backend
+
+def fetch_divisions():
+    """Both division sheets in a single batched read."""
+    values = get_backend().read_ranges(DIVISIONS)
+    return {division: fill_gaps(rows) for division, rows in zip(DIVISIONS, values)}
+
+def publish_standings(standings, updated_at=None):
+    """Swap standings into the in-memory snapshot and notify open streams."""
+    rows = standings[DIVISIONS[0]].page(config['actMatchLetter'])
+    snapshot.replace(rows, standings, updated_at)
+    _, updated_at, version = snapshot.get()
+    broker.publish(version, rows, updated_at)
+    return updated_at
+
+def refresh_snapshot():
+    """Fetch the division sheets once and swap the result into the in-memory snapshot."""
+    try:
+        with REGISTRY.timer("mor_leaderboard_refresh_seconds"):
+            standings = build_standings(fetch_divisions(), config)
+            updated_at = publish_standings(standings)
+    except Exception as e:
+        # Keep serving the last good snapshot
+        snapshot.last_error = str(e)
+        print(f"Error refreshing leaderboard: {e}")
+        return
+
+    if SNAPSHOT_PATH:
+        try:
+            save_snapshot(SNAPSHOT_PATH, standings, updated_at)
+        except Exception as e:
+            print(f"Error saving snapshot to {SNAPSHOT_PATH}: {e}")
+
+def load_saved_snapshot():
+    """Serve the last saved standings straight away instead of waiting on the sheet."""
+    if not SNAPSHOT_PATH or not snapshot.is_empty():
+        return
+    loaded = load_snapshot(SNAPSHOT_PATH, config)
+    if loaded is not None:
+        publish_standings(*loaded)
+        print(f"Loaded leaderboard snapshot from {SNAPSHOT_PATH} ({snapshot.age():.0f}s old)")
+
+def _refresh_in_background():
+    try:
+        refresh_snapshot()
+    finally:
+        _refresh_lock.release()
+
+def start_scheduler(first_run_now: bool = True):
+    """Start the background refresh job once per process.
+
+    first_run_now=False waits an interval before the first run, for callers
+    that are about to refresh inline anyway.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None or not AUTO_UPDATE_ENABLED:
+            return
+        from apscheduler.schedulers.background import BackgroundScheduler
+        _scheduler = BackgroundScheduler(daemon=True)
+        _scheduler.add_job(
+            refresh_snapshot, 'interval',
+            minutes=UPDATE_INTERVAL_MINUTES,
+            max_instances=1,
+            coalesce=True,
+            **({'next_run_time': datetime.now()} if first_run_now else {})
+        )
+        _scheduler.start()
+
+def ensure_fresh():
+    """Refresh when no background job keeps the snapshot warm: inline only if there is nothing to serve."""
+    age = snapshot.age()
+    # On a cold start this request reads the sheet itself, so the job's first run can wait
+    start_scheduler(first_run_now=age is not None)
+    if age is None:
+        refresh_snapshot()
+    elif not AUTO_UPDATE_ENABLED and age > UPDATE_INTERVAL_MINUTES * 60:
+        # Serve what we have and refresh behind it, so a slow or throttled sheet never holds up the response
+        if _refresh_lock.acquire(blocking=False):
+            threading.Thread(target=_refresh_in_background, daemon=True).start()
+
+def _with_age(response):
+    age = snapshot.age()
+    if age is not None:
+        response.headers["X-Data-Age"] = f"{age:.0f}"
+    return response
 
 @app.route("/")
 def leaderboard():
-    sheet = get_google_sheet()
-    
-    with open('columnValues.json') as f:
-        config = json.load(f)
-    
-    team_col = ord(config['teamName']) - 97  # Convert letter to 0-based index
-    time_col = ord(config['actMatchLetter']) - 65
-    
-    all_values = sheet.get_all_values()[2:]  # Start from row 3
-    
-    leaderboard_data = []
-    for row in all_values:
-        if len(row) > max(team_col, time_col) and row[team_col].strip() and row[time_col].strip():
-            leaderboard_data.append({
-                "team": row[team_col],
-                "time": row[time_col]
-            })
-        else:
-            break
-    
+    ensure_fresh()
+    leaderboard_data, updated_at, version = snapshot.get()
+
+    # The page only changes when the snapshot does, so render once per version
+    def render(updated_at=updated_at):
+        return render_template(
+            "leaderboard2.html",
+            leaderboard=leaderboard_data,
+            updated_at=updated_at
+        ).encode()
+
+    return _with_age(cached_response(
+        _responses, (snapshot, version), ("html",), render,
+        "text/html", updated_at, CACHE_CONTROL,
+        content=lambda: render(updated_at=None)  # Same page from any instance, same ETag
+    ))
+
+def _int_arg(name, default, maximum=None):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    number = int(value)
+    if number < 0:
+        raise ValueError(f"{name} must not be negative")
+    return min(number, maximum) if maximum is not None else number
+
+@app.route("/api/leaderboard")
+def api_leaderboard():
+    """Ranked entries for a division, day and ranking, one page at a time."""
+    ensure_fresh()
+    standings, updated_at, version = snapshot.get_standings()
+
+    division = request.args.get("division", DIVISIONS[0])
+    ranking = request.args.get("ranking", "actual")
+    if division not in DIVISIONS:
+        return jsonify({"error": f"Unknown division: {division}"}), 404
+    if snapshot.is_empty():
+        return jsonify({"error": "Standings are not available yet", "last_error": snapshot.last_error}), 503
+    if division not in standings:
+        return jsonify({"error": f"No standings for division: {division}"}), 404
+    if ranking not in RANKINGS:
+        return jsonify({"error": f"Unknown ranking: {ranking}", "rankings": list(RANKINGS)}), 400
+
+    division_standings = standings[division]
     try:
-        leaderboard_data.sort(key=lambda x: x["time"])
-    except Exception as e:
-        print(f"Error sorting data: {e}")
+        day = request.args.get("day") or division_standings.latest_day(ranking)
+        column = division_standings.column(day, ranking)
+        offset = _int_arg("offset", 0)
+        limit = _int_arg("limit", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def render(**snapshot_fields):
+        return json.dumps({
+            "division": division,
+            "day": day,
+            "ranking": ranking,
+            "total": division_standings.count(column),
+            "offset": offset,
+            "limit": limit,
+            **snapshot_fields,
+            "entries": division_standings.page(column, offset, limit)
+        }).encode()
+
+    # The ETag leaves out the fetch time and version, which differ between instances
+    return _with_age(cached_response(
+        _responses, (snapshot, version), ("api", division, day, ranking, offset, limit),
+        lambda: render(updated_at=updated_at, version=version),
+        "application/json", updated_at, CACHE_CONTROL, content=render
+    ))
+
+@app.route("/api/stream")
+def stream():
+    """Server-sent events: a full snapshot, then only changed rows and rank moves."""
+    ensure_fresh()
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.args.get("lastEventId"))
+    except (TypeError, ValueError):
+        last_id = None
+
+    def events(last_id):
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        yield f"retry: {RECONNECT_MS}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            texts, last_id = broker.wait(last_id, max(0.0, min(HEARTBEAT_SECONDS, remaining)))
+            if texts:
+                yield "".join(texts)
+            elif remaining > 0:
+                yield ": heartbeat\n\n"
+            if time.monotonic() >= deadline:
+                return
+
+    return Response(events(last_id), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of this process's API, cache and snapshot metrics.
+
+    Syncs run in `mor.py sync --watch`, which serves its own /metrics on METRICS_PORT.
+    """
+    age = snapshot.age()
+    if age is not None:
+        REGISTRY.set("mor_leaderboard_snapshot_age_seconds", age)
+    REGISTRY.set("mor_leaderboard_snapshot_version", snapshot.version)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
-    return render_template("leaderboard2.html", leaderboard=leaderboard_data)
+load_saved_snapshot()
 
 if __name__ == "__main__":
     port = int(os.getenv('PORT', 5000))
-    app.run(debug=True, port=port)
\ No newline at end of file
+    app.run(debug=True, port=port)
@@ -0,0 +1,30 @@
+import copy
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+CONFIG_PATH = os.getenv('COLUMN_CONFIG', 'columnValues.json')
+
+_configs: Dict[str, Tuple[int, Dict]] = {}  # absolute path -> (mtime, parsed config)
+_lock = threading.Lock()
+
+def config_version(path: Optional[str] = None) -> int:
+    """Modification time of the config file, to tell when it has been edited."""
+    return os.stat(os.path.abspath(path or CONFIG_PATH)).st_mtime_ns
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """The column layout in columnValues.json (or COLUMN_CONFIG).
+
+    The file is parsed once and re-read only when its modification time
+    changes; each caller gets its own copy so it can adjust settings freely.
+    """
+    path = os.path.abspath(path or CONFIG_PATH)
+    mtime = config_version(path)
+    with _lock:
+        cached = _configs.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path) as f:
+                cached = (mtime, json.load(f))
+            _configs[path] = cached
+    return copy.deepcopy(cached[1])
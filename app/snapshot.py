@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from racetable import RaceTable
+from standings import Standings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1  # Bump when the file layout changes; older files are ignored
+
+class LeaderboardSnapshot:
+    """Thread-safe in-memory copy of the leaderboard, refreshed in the background."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: List[Dict] = []
+        self._standings: Dict[str, Standings] = {}
+        self.updated_at: Optional[float] = None
+        self.version = 0
+        self.last_error: Optional[str] = None
+
+    def replace(self, rows: List[Dict], standings: Optional[Dict[str, Standings]] = None,
+                updated_at: Optional[float] = None):
+        """Swap in a freshly built leaderboard and the per-division standings behind it."""
+        with self._lock:
+            self._rows = rows
+            self._standings = standings or {}
+            self.updated_at = time.time() if updated_at is None else updated_at
+            self.version += 1
+            self.last_error = None
+
+    def get(self) -> Tuple[List[Dict], Optional[float], int]:
+        """Return the rows, when they were fetched and the snapshot version."""
+        with self._lock:
+            return self._rows, self.updated_at, self.version
+
+    def get_standings(self) -> Tuple[Dict[str, Standings], Optional[float], int]:
+        """Return the standings by division, when they were fetched and the snapshot version."""
+        with self._lock:
+            return self._standings, self.updated_at, self.version
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh, or None if never refreshed."""
+        updated_at = self.updated_at
+        if updated_at is None:
+            return None
+        return time.time() - updated_at
+
+    def is_empty(self) -> bool:
+        return self.updated_at is None
+
+def save_snapshot(path: str, standings: Dict[str, Standings], updated_at: float):
+    """Write the division tables to an .npz file, atomically replacing any previous one."""
+    arrays = {}
+    meta = {"format": SNAPSHOT_FORMAT, "updated_at": updated_at, "divisions": {}}
+    for division, division_standings in standings.items():
+        table = division_standings.table
+        arrays[f"{division}/team_ids"] = np.array(table.team_ids, dtype=str)
+        arrays[f"{division}/names"] = np.array(table.names, dtype=str)
+        arrays[f"{division}/row_numbers"] = table.row_numbers
+        arrays[f"{division}/handicaps"] = table.handicaps
+        for col, times in table.results.items():
+            arrays[f"{division}/results/{col}"] = times
+        meta["divisions"][division] = sorted(table.results)
+    arrays["meta"] = np.array(json.dumps(meta))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_snapshot(path: str, config: Dict) -> Optional[Tuple[Dict[str, Standings], float]]:
+    """Standings and their fetch time from a saved snapshot, or None if missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != SNAPSHOT_FORMAT:
+                logger.warning(f"Ignoring snapshot {path}: format {meta.get('format')}, expected {SNAPSHOT_FORMAT}")
+                return None
+            standings = {}
+            for division, result_cols in meta["divisions"].items():
+                table = RaceTable(data[f"{division}/team_ids"].tolist(), data[f"{division}/row_numbers"])
+                table.names = data[f"{division}/names"].tolist()
+                table.handicaps = data[f"{division}/handicaps"]
+                table.results = {col: data[f"{division}/results/{col}"] for col in result_cols}
+                standings[division] = Standings(table, config)
+            return standings, meta["updated_at"]
+    except Exception as e:
+        logger.error(f"Error loading snapshot {path}: {e}")
+        return None
@@ -0,0 +1,109 @@
+import heapq
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from legtimes import format_seconds
+from racetable import DAYS, RaceTable
+
+# Ranking name -> result key in the day's config. Day1 has no running totals,
+# so its cumulative rankings fall back to the day's own result.
+RANKINGS = {
+    "actual": ("act", "act"),
+    "handicap": ("hc", "hc"),
+    "cumulative": ("tact", "act"),
+    "cumulative_handicap": ("thc", "hc")
+}
+
+class Standings:
+    """Numeric rankings for one division, built once per snapshot.
+
+    Sort indexes are computed per result column on first use and reused until
+    the next snapshot. Small top-K requests against a column that hasn't been
+    sorted yet use a heap instead of sorting the whole field.
+    """
+
+    def __init__(self, table: RaceTable, config: Dict, first_row: int = 3):
+        self.table = table
+        self.config = config
+        # Rows above first_row are headers on the division sheets
+        ranked = table.row_numbers >= first_row
+        self.results = {col: np.where(ranked, times, -1) for col, times in table.results.items()}
+        self._seconds = {col: times.tolist() for col, times in self.results.items()}
+        self._order: Dict[str, np.ndarray] = {}
+
+    def column(self, day: str, ranking: str) -> str:
+        """Result column letter for a day and ranking name."""
+        if day not in DAYS:
+            raise ValueError(f"Unknown day: {day}")
+        if ranking not in RANKINGS:
+            raise ValueError(f"Unknown ranking: {ranking}")
+        key, fallback = RANKINGS[ranking]
+        day_config = self.config[day]
+        return day_config.get(key, day_config[fallback])
+
+    def latest_day(self, ranking: str = "actual") -> str:
+        """Last day with at least one result for this ranking, Day1 if none."""
+        for day in reversed(DAYS):
+            if (self.results[self.column(day, ranking)] >= 0).any():
+                return day
+        return DAYS[0]
+
+    def count(self, col: str) -> int:
+        """Teams with a result in this column."""
+        return int((self.results[col] >= 0).sum())
+
+    def order(self, col: str) -> np.ndarray:
+        """Positions of teams with a result, fastest first (ties keep sheet order)."""
+        order = self._order.get(col)
+        if order is None:
+            times = self.results[col]
+            finished = np.flatnonzero(times >= 0)
+            order = finished[np.argsort(times[finished], kind="stable")]
+            self._order[col] = order
+        return order
+
+    def _top(self, col: str, k: int) -> List[int]:
+        seconds = self._seconds[col]
+        finished = ((t, pos) for pos, t in enumerate(seconds) if t >= 0)
+        return [pos for _, pos in heapq.nsmallest(k, finished)]
+
+    def page(self, col: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Ranked entries [offset, offset + limit) for a result column."""
+        end = None if limit is None else offset + limit
+        if col not in self._order and end is not None and end * 4 < len(self.table):
+            positions = self._top(col, end)[offset:]
+        else:
+            positions = self.order(col)[offset:end].tolist()
+        return self._entries(col, positions, offset)
+
+    def _entries(self, col: str, positions: List[int], offset: int) -> List[Dict]:
+        seconds = self._seconds[col]
+        times = [seconds[pos] for pos in positions]
+        formatted = format_seconds(np.asarray(times, dtype=np.int64))
+        # Competition ranking: tied times share the rank of the first of them
+        first_rank = self._rank(col, times[0]) if times else 0
+        entries = []
+        rank = first_rank
+        for i, pos in enumerate(positions):
+            if i and times[i] != times[i - 1]:
+                rank = offset + i + 1
+            entries.append({
+                "rank": rank,
+                "team_id": self.table.team_ids[pos],
+                "team": self.table.names[pos],
+                "time": formatted[i],
+                "seconds": times[i]
+            })
+        return entries
+
+    def _rank(self, col: str, seconds: int) -> int:
+        times = self.results[col]
+        return int(((times >= 0) & (times < seconds)).sum()) + 1
+
+def build_standings(values_by_division: Dict[str, List[List[str]]], config: Dict) -> Dict[str, "Standings"]:
+    """Parse each division sheet's values into numeric rankings."""
+    return {
+        division: Standings(RaceTable.from_division_values(values, config), config)
+        for division, values in values_by_division.items()
+    }
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from racetable import DAYS
+from standings import Standings
+
+# Where `mor.py export` writes by default: the repo's public/, which netlify.toml publishes
+DEFAULT_PUBLISH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "public")
+# Export after every scheduled sync when set
+PUBLISH_DIR = os.getenv('PUBLISH_DIR', '')
+EXPORT_RANKINGS = ["actual", "handicap"]
+POLL_SECONDS = 60
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+_templates = None
+
+def _template():
+    global _templates
+    if _templates is None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+        _templates = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html"]))
+    return _templates.get_template("leaderboard2.html")
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Atomically replace `path` with `data` unless it already holds exactly that; returns whether it wrote."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+def page_path(division: str, day: str, ranking: str) -> str:
+    """Site path of a page without its extension, e.g. /open/day2/handicap."""
+    return f"/{division.lower()}/{day.lower()}/{ranking}"
+
+def _nav(divisions: List[str], division: str, day: str, ranking: str) -> List[List[Dict]]:
+    """Links to switch division, day or ranking from the current page."""
+    def link(label, current, target):
+        return {"label": label, "current": current, "href": page_path(*target) + ".html"}
+    return [
+        [link(name, name == division, (name, day, ranking)) for name in divisions],
+        [link(name.replace("Day", "Day "), name == day, (division, name, ranking)) for name in DAYS],
+        [link(name.title(), name == ranking, (division, day, name)) for name in EXPORT_RANKINGS],
+    ]
+
+def export_static(standings: Dict[str, Standings], updated_at: Optional[float],
+                  output_dir: str = DEFAULT_PUBLISH_DIR) -> Dict[str, int]:
+    """Render an HTML page and a JSON file per division, day and ranking into output_dir.
+
+    Only updated.json carries the sync time, so the other files change, and
+    are rewritten, only when their standings do; a CDN keeps serving its
+    cached copies of the rest. index.html is the first division's latest day.
+    """
+    template = _template()
+    divisions = list(standings)
+    files: Dict[str, bytes] = {}
+    pages = []
+
+    for division, division_standings in standings.items():
+        for day in DAYS:
+            for ranking in EXPORT_RANKINGS:
+                column = division_standings.column(day, ranking)
+                entries = division_standings.page(column)
+                path = page_path(division, day, ranking)
+                files[path + ".json"] = json.dumps({
+                    "division": division,
+                    "day": day,
+                    "ranking": ranking,
+                    "total": len(entries),
+                    "entries": entries
+                }).encode()
+                files[path + ".html"] = template.render(
+                    leaderboard=entries,
+                    updated_at=None,
+                    static=True,
+                    json_url=path + ".json",
+                    poll_ms=POLL_SECONDS * 1000,
+                    nav=_nav(divisions, division, day, ranking)
+                ).encode()
+                pages.append({"division": division, "day": day, "ranking": ranking, "path": path})
+
+    if divisions:
+        first = divisions[0]
+        files["/index.html"] = files[page_path(first, standings[first].latest_day(), EXPORT_RANKINGS[0]) + ".html"]
+    files["/index.json"] = json.dumps({"pages": pages}).encode()
+    files["/updated.json"] = json.dumps({"updated_at": updated_at}).encode()
+
+    written = sum(write_if_changed(os.path.join(output_dir, name.lstrip("/")), data) for name, data in files.items())
+    return {"written": written, "unchanged": len(files) - written}
@@ -0,0 +1,72 @@
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+def format_event(event_id: int, event: str, data: Dict) -> str:
+    """One server-sent event, ready to write to the stream."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+def diff_rows(old: Dict[str, Dict], new: Dict[str, Dict]) -> Tuple[List[Dict], List[str], List[Dict]]:
+    """Changed or added rows, removed team ids and rank moves between two leaderboards."""
+    changed = [row for team_id, row in new.items() if old.get(team_id) != row]
+    removed = [team_id for team_id in old if team_id not in new]
+    moves = [
+        {"team_id": row["team_id"], "from": old[row["team_id"]]["rank"], "to": row["rank"]}
+        for row in changed
+        if row["team_id"] in old and old[row["team_id"]]["rank"] != row["rank"]
+    ]
+    return changed, removed, moves
+
+class DeltaBroker:
+    """Fans leaderboard changes out to every open stream.
+
+    publish() diffs and serializes each change once; subscribers just wait on
+    a condition and copy the prepared text. The last `history` deltas are kept
+    so a reconnecting client can catch up from its Last-Event-ID; anyone
+    further behind gets a full snapshot event instead.
+    """
+
+    def __init__(self, history: int = 50):
+        self._cond = threading.Condition()
+        self._events: deque = deque(maxlen=history)  # (event id, text)
+        self._rows: Dict[str, Dict] = {}
+        self._snapshot: Optional[Tuple[int, str]] = None
+        self._dropped_through = 0  # Newest event id no longer in history
+
+    def publish(self, event_id: int, rows: List[Dict], updated_at: Optional[float]) -> Optional[Dict]:
+        """Record new standings; returns the delta, or None if nothing changed."""
+        new = {row["team_id"]: row for row in rows}
+        snapshot_text = format_event(event_id, "snapshot", {"version": event_id, "updated_at": updated_at, "rows": rows})
+
+        with self._cond:
+            delta = None
+            if self._snapshot is not None:
+                changed, removed, moves = diff_rows(self._rows, new)
+                if changed or removed:
+                    delta = {"version": event_id, "updated_at": updated_at,
+                             "rows": changed, "removed": removed, "moves": moves}
+                    if len(self._events) == self._events.maxlen:
+                        self._dropped_through = self._events[0][0]
+                    self._events.append((event_id, format_event(event_id, "delta", delta)))
+            self._rows = new
+            self._snapshot = (event_id, snapshot_text)
+            self._cond.notify_all()
+        return delta
+
+    def _pending(self, last_id: Optional[int]) -> Tuple[List[str], Optional[int]]:
+        if self._snapshot is None:
+            return [], last_id
+        snapshot_id, snapshot_text = self._snapshot
+        if last_id is None or last_id > snapshot_id or last_id < self._dropped_through:
+            return [snapshot_text], snapshot_id
+        return [text for event_id, text in self._events if event_id > last_id], snapshot_id
+
+    def wait(self, last_id: Optional[int], timeout: float) -> Tuple[List[str], Optional[int]]:
+        """Events the client hasn't seen, waiting up to `timeout` for one; returns them and the new last id."""
+        with self._cond:
+            texts, new_id = self._pending(last_id)
+            if not texts and timeout > 0:
+                self._cond.wait(timeout)
+                texts, new_id = self._pending(last_id)
+            return texts, new_id
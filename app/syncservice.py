@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from a1 import absolute_range_name, fill_gaps
+from function import RelayManager
+from snapshot import save_snapshot
+from standings import build_standings
+from staticexport import PUBLISH_DIR, export_static
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+AUTO_UPDATE_ENABLED = os.getenv('AUTO_UPDATE_ENABLED', 'true').lower() == 'true'
+UPDATE_INTERVAL_MINUTES = float(os.getenv('UPDATE_INTERVAL_MINUTES', 5))
+SYNC_JITTER_SECONDS = float(os.getenv('SYNC_JITTER_SECONDS', 15))
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'leaderboard_snapshot.npz')
+
+class SyncService:
+    """Runs update_all_divisions on an interval, skipping runs when nothing changed.
+
+    Before each run a probe reads column A of the day sheets (their row counts)
+    and the team/name/handicap columns of the division sheets in one request.
+    If that matches the last successful run the sync is skipped, except that
+    every `max_skips` skips a run goes ahead anyway to pick up edited responses,
+    and an edited column config always runs.
+    """
+
+    def __init__(self, manager: RelayManager, interval_minutes: float = UPDATE_INTERVAL_MINUTES,
+                 jitter_seconds: float = SYNC_JITTER_SECONDS, max_workers: int = 1, max_skips: int = 5,
+                 history: int = 100, on_sync: Optional[Callable[[], None]] = None):
+        self.manager = manager
+        self.interval_minutes = interval_minutes
+        self.jitter_seconds = jitter_seconds
+        self.max_workers = max_workers
+        self.max_skips = max_skips
+        self.on_sync = on_sync
+        self.history: deque = deque(maxlen=history)
+        self.scheduler = None
+        self._signature: Optional[Tuple] = None
+        self._skips = 0
+        self._lock = threading.Lock()
+
+    def probe_ranges(self) -> List[str]:
+        ranges = [absolute_range_name(day, "A:A") for day in self.manager.days]
+        last_col = self.manager.config.get("handicapFactor", "D")
+        ranges += [absolute_range_name(division, f"B:{last_col}") for division in self.manager.divisions]
+        return ranges
+
+    def probe(self) -> Tuple:
+        """Cheap fingerprint of the inputs: day sheet row counts and division team columns."""
+        values = self.manager.rate_limiter.call(self.manager.backend.read_ranges, self.probe_ranges())
+        n_days = len(self.manager.days)
+        row_counts = tuple(len(rows) for rows in values[:n_days])
+        division_hashes = tuple(
+            hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+            for rows in values[n_days:]
+        )
+        return row_counts + division_hashes
+
+    def run_once(self, force: bool = False) -> Dict:
+        """Probe and sync if needed; returns the run's record, which is also kept in history."""
+        with self._lock:
+            record = {'started_at': time.time(), 'outcome': None, 'duration_seconds': 0.0,
+                      'cells_written': 0, 'failed_tasks': 0, 'error': None}
+            start = time.perf_counter()
+            try:
+                if self.manager.backend is None:
+                    self.manager.connect_sheets()
+                # Reload first so the probe reads the new layout and the edit replans every team
+                reloaded = self.manager.reload_config_if_changed()
+                signature = self.probe()
+                if not force and not reloaded and signature == self._signature and self._skips < self.max_skips:
+                    self._skips += 1
+                    record['outcome'] = 'skipped'
+                else:
+                    self.manager.update_all_divisions(max_workers=self.max_workers)
+                    record['cells_written'] = sum(stats['written'] for stats in self.manager.write_stats.values())
+                    record['failed_tasks'] = sum(1 for task in self.manager.task_results.values() if task['error'])
+                    record['outcome'] = 'partial' if record['failed_tasks'] else 'synced'
+                    self._skips = 0
+                    # Only trust the fingerprint once everything it covers was written
+                    self._signature = signature if not record['failed_tasks'] else None
+            except Exception as e:
+                logger.error(f"Scheduled sync failed: {e}", exc_info=True)
+                record['outcome'] = 'failed'
+                record['error'] = str(e)
+                self._signature = None
+
+            record['duration_seconds'] = time.perf_counter() - start
+            self.history.append(record)
+            logger.info(f"Scheduled sync {record['outcome']} in {record['duration_seconds']:.2f}s ({record['cells_written']} cells written)")
+
+        if record['outcome'] in ('synced', 'partial') and self.on_sync is not None:
+            try:
+                self.on_sync()
+            except Exception as e:
+                logger.error(f"Error in post-sync callback: {e}", exc_info=True)
+        return record
+
+    def start(self, blocking: bool = False):
+        """Schedule run_once every interval (first run immediately); blocking runs in this thread."""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
+        self.scheduler = BlockingScheduler() if blocking else BackgroundScheduler(daemon=True)
+        self.scheduler.add_job(
+            self.run_once, 'interval',
+            minutes=self.interval_minutes,
+            jitter=self.jitter_seconds,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now()
+        )
+        self.scheduler.start()
+
+    def shutdown(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+
+def read_standings(manager: RelayManager):
+    """Re-read the division sheets in one request and rank them."""
+    values = manager.rate_limiter.call(manager.backend.read_ranges, manager.divisions)
+    return build_standings({
+        division: fill_gaps(rows) for division, rows in zip(manager.divisions, values)
+    }, manager.config)
+
+def save_standings(manager: RelayManager, path: str = SNAPSHOT_PATH):
+    """Re-read the division sheets after a sync and save their standings for the server's warm start."""
+    save_snapshot(path, read_standings(manager), time.time())
+
+def publish(manager: RelayManager, snapshot_path: str = SNAPSHOT_PATH,
+            publish_dir: str = PUBLISH_DIR) -> Optional[Dict[str, int]]:
+    """After a sync, save the snapshot and/or export the static site from one read of the divisions.
+
+    Returns export_static's file counts, or None if nothing was exported.
+    """
+    standings = read_standings(manager)
+    updated_at = time.time()
+    if snapshot_path:
+        save_snapshot(snapshot_path, standings, updated_at)
+    if publish_dir:
+        result = export_static(standings, updated_at, publish_dir)
+        logger.info(f"Exported static leaderboard to {publish_dir}: {result['written']} files written, {result['unchanged']} unchanged")
+        return result
+    return None
+
+def sync_callback(manager: RelayManager) -> Optional[Callable[[], None]]:
+    """The post-sync step for the configured SNAPSHOT_PATH and PUBLISH_DIR, if any."""
+    if not SNAPSHOT_PATH and not PUBLISH_DIR:
+        return None
+    return lambda: publish(manager)
+
+if __name__ == "__main__":
+    # mor.py is the entry point; this keeps `python syncservice.py` working
+    import sys
+    from mor import main
+    main(["sync"] + (["--watch"] if AUTO_UPDATE_ENABLED else []) + sys.argv[1:])
@@ -0,0 +1,95 @@
+import logging
+import math
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from racetable import RaceTable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HANDICAP = 1.0
+
+class TeamEntry(NamedTuple):
+    division: str
+    row: int  # 1-based row on the division sheet
+    position: int  # Position in the division's RaceTable
+    handicap: float  # DEFAULT_HANDICAP when the sheet's factor is missing or invalid
+    handicap_missing: bool
+
+class TeamRegistry:
+    """Every team on the division sheets, looked up and validated once per sync.
+
+    Built from the parsed Open/Mixed tables, it maps team id to division, row
+    and handicap for all the day sheets to share. Problems are logged once
+    when it is built: ids listed more than once (the last row wins, as in
+    RaceTable), missing handicaps, and, per day sheet, ids on no division.
+    """
+
+    def __init__(self, tables: Dict[str, RaceTable]):
+        self.tables = tables
+        self.by_division: Dict[str, Dict[str, TeamEntry]] = {}
+        self.teams: Dict[str, TeamEntry] = {}
+        self.duplicates: Dict[str, List[Tuple[str, int]]] = {}  # team id -> every (division, row) it is on
+        self.missing_handicaps: Set[str] = set()
+        self._unknown: Dict[str, Tuple[RaceTable, Set[str]]] = {}
+
+        seen: Dict[str, List[Tuple[str, int]]] = {}
+        for division, table in tables.items():
+            entries = {}
+            for pos, (team_id, row) in enumerate(zip(table.team_ids, table.row_numbers.tolist())):
+                handicap = float(table.handicaps[pos])
+                missing = math.isnan(handicap)
+                # Later rows replace earlier ones, as in RaceTable
+                entries[team_id] = TeamEntry(division, row, pos, DEFAULT_HANDICAP if missing else handicap, missing)
+                seen.setdefault(team_id, []).append((division, row))
+            self.by_division[division] = entries
+            for team_id, entry in entries.items():
+                self.teams.setdefault(team_id, entry)
+                if entry.handicap_missing:
+                    self.missing_handicaps.add(team_id)
+
+        self.duplicates = {team_id: places for team_id, places in seen.items() if len(places) > 1}
+        self._log_issues()
+
+    def _log_issues(self):
+        for team_id, places in sorted(self.duplicates.items()):
+            listed = ", ".join(f"{division} row {row}" for division, row in places)
+            logger.warning(f"Team {team_id} is listed more than once ({listed})")
+        if self.missing_handicaps:
+            logger.warning(f"No valid handicap factor for teams {', '.join(sorted(self.missing_handicaps))}. Using factor {DEFAULT_HANDICAP:g}.")
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def __contains__(self, team_id: str) -> bool:
+        return team_id in self.teams
+
+    def lookup(self, team_id: str, division: Optional[str] = None) -> Optional[TeamEntry]:
+        """A team's entry, in the given division or wherever it is listed first."""
+        if division is None:
+            return self.teams.get(team_id)
+        return self.by_division.get(division, {}).get(team_id)
+
+    def unknown(self, day: str, day_table: RaceTable) -> Set[str]:
+        """Team ids on a day sheet that no division lists, logged once per parsed day table."""
+        cached = self._unknown.get(day)
+        if cached is None or cached[0] is not day_table:
+            unknown = {team_id for team_id in day_table.team_ids if team_id not in self.teams}
+            if unknown:
+                logger.warning(f"{day} has responses for unknown teams {', '.join(sorted(unknown))}")
+            cached = (day_table, unknown)
+            self._unknown[day] = cached
+        return cached[1]
+
+    def keys(self, division: str) -> Dict[str, Tuple[int, Optional[float]]]:
+        """(row, handicap) per team, used to spot moved or re-handicapped teams between syncs."""
+        return {
+            team_id: (entry.row, None if entry.handicap_missing else entry.handicap)
+            for team_id, entry in self.by_division.get(division, {}).items()
+        }
+
+def build_registry(tables: Dict[str, RaceTable], previous: Optional[TeamRegistry] = None) -> TeamRegistry:
+    """Reuse `previous` if it was built from these same parsed tables, otherwise build a new registry."""
+    if (previous is not None and previous.tables.keys() == tables.keys()
+            and all(previous.tables[name] is table for name, table in tables.items())):
+        return previous
+    return TeamRegistry(tables)
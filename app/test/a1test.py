@@ -0,0 +1,29 @@
+import unittest
+from gspread import utils
+import a1
+
+class TestA1(unittest.TestCase):
+    def test_matches_gspread(self):
+        """The lightweight helpers must agree with gspread.utils, which they replace on hot paths."""
+        for row in (1, 2, 999):
+            for col in list(range(1, 60)) + [702, 703, 18278]:
+                label = utils.rowcol_to_a1(row, col)
+                self.assertEqual(a1.rowcol_to_a1(row, col), label)
+                self.assertEqual(a1.a1_to_rowcol(label), utils.a1_to_rowcol(label))
+        self.assertEqual(a1.a1_to_rowcol("ab12"), (12, 28))
+        self.assertEqual(a1.absolute_range_name("Sheet'1", "A:B"), utils.absolute_range_name("Sheet'1", "A:B"))
+        self.assertEqual(a1.absolute_range_name("Open"), "'Open'")
+
+    def test_fill_gaps(self):
+        for values, kwargs in [([], {}), ([], {"cols": 3}), ([["a"], ["a", "b", "c"]], {}),
+                               ([["a"]], {"rows": 3, "cols": 2}), ([["a", "b", "c"]], {"cols": 2})]:
+            self.assertEqual(a1.fill_gaps(values, **kwargs), utils.fill_gaps(values, **kwargs))
+
+    def test_invalid_labels(self):
+        with self.assertRaises(ValueError):
+            a1.a1_to_rowcol("12")
+        with self.assertRaises(ValueError):
+            a1.rowcol_to_a1(0, 1)
+
+if __name__ == "__main__":
+    unittest.main()
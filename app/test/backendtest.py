@@ -0,0 +1,57 @@
+import unittest
+from backend import LocalBackend, QuotaExceededError, SheetBackend, range_bounds, split_range
+from function import RelayManager
+from ratelimit import RateLimiter
+from synctest import day_row
+
+class TestSheetBackend(unittest.TestCase):
+    def test_incomplete_backend_cannot_be_created(self):
+        class ReadOnly(SheetBackend):
+            def open(self, name=None): pass
+            def worksheet(self, sheet_name): pass
+            def read_ranges(self, ranges, value_render_option='FORMATTED_VALUE'): return []
+
+        with self.assertRaises(TypeError):
+            ReadOnly()
+
+class TestLocalBackend(unittest.TestCase):
+    def test_range_parsing(self):
+        self.assertEqual(split_range("'Open'!E3:H10"), ("Open", "E3:H10"))
+        self.assertEqual(split_range("Day1"), ("Day1", ""))
+        self.assertEqual(range_bounds("E3:H10"), (3, 5, 10, 8))
+        self.assertEqual(range_bounds("A:AB"), (1, 1, None, 28))
+
+    def test_read_write_round_trip(self):
+        """Reads should come back trimmed like the Sheets API."""
+        backend = LocalBackend()
+        backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.2", ""]])
+        backend.batch_write([{'range': "'Open'!E2:F3", 'values': [["1:00:00", "x"], ["", "2:00:00"]]}])
+
+        self.assertEqual(backend.read_ranges(["'Open'!A:F"])[0], [["Header"], ["", "1", "Team A", "1.2", "1:00:00", "x"], ["", "", "", "", "", "2:00:00"]])
+        self.assertEqual(backend.read_ranges(["'Open'!E2:E3"])[0], [["1:00:00"]])
+        self.assertEqual(backend.read_ranges(["'Mixed'!A:F"])[0], [])
+        self.assertEqual(backend.latency["write"]["calls"], 1)
+        self.assertEqual(backend.latency["read"]["calls"], 3)
+
+    def test_simulated_quota_errors(self):
+        backend = LocalBackend(quota_error_rate=1.0)
+        with self.assertRaises(QuotaExceededError):
+            backend.read_ranges(["Open"])
+
+    def test_manager_runs_against_local_backend(self):
+        """The unchanged manager should sync end to end without network access."""
+        backend = LocalBackend(quota_error_rate=0.3, seed=7)
+        backend.load_sheet("Day1", [["Header"], ["Header"], day_row("1", ["0:30:00", "0:45:00"])])
+        backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.2"]])
+
+        manager = RelayManager(backend=backend)
+        manager.rate_limiter = RateLimiter(base_delay=0.001, max_retries=20)
+        manager.connect_sheets = lambda: None
+        results = manager.update_all_divisions()
+
+        self.assertEqual(results["Open"]["Day1"], (1, 1))
+        backend.quota_error_rate = 0
+        self.assertEqual(backend.read_ranges(["'Open'!E2:H2"])[0], [["1:15:00", '=TEXT((E2)/95.3, "hh:mm:ss")', "=E2*1.2", '=TEXT((G2)/95.3, "hh:mm:ss")']])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import server
+from benchmark import bench_leaderboard, bench_legtimes, bench_sync, generate_race
+from function import RelayManager
+
+class TestSyntheticRace(unittest.TestCase):
+    def test_generated_sheets(self):
+        """Every sheet the sync reads should be generated, with realistic mess."""
+        config = RelayManager().config
+        sheets = generate_race(200, config, seed=3)
+        self.assertEqual(set(sheets), {"Day1", "Day2", "Day3", "Open", "Mixed"})
+        self.assertEqual(len(sheets["Open"]) + len(sheets["Mixed"]) - 4, 200)
+        handicaps = [row[3] for row in sheets["Open"][2:] + sheets["Mixed"][2:]]
+        self.assertIn("", handicaps)
+        legs = [cell for row in sheets["Day1"][2:] for cell in row[5:]]
+        self.assertIn("", legs)
+        self.assertEqual(generate_race(200, config, seed=3), sheets)
+
+    def test_benchmarks_report_metrics(self):
+        sync = bench_sync(50)
+        self.assertEqual(sync["api_reads"], 1)
+        self.assertGreater(sync["cells"], 0)
+        self.assertGreater(sync["peak_memory_bytes"], 0)
+        snapshot, backend = server.snapshot, server._backend
+        leaderboard = bench_leaderboard(50, requests=5)
+        self.assertEqual(leaderboard["api_reads"], 1)
+        # The server's own globals are left as they were
+        self.assertIs(server.snapshot, snapshot)
+        self.assertIs(server._backend, backend)
+        self.assertGreater(bench_legtimes(50)["speedup"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import MagicMock
+from cache import MISSING, SheetCache
+from function import RelayManager
+from synctest import day_row
+
+class TestSheetCache(unittest.TestCase):
+    def test_expiry(self):
+        cache = SheetCache()
+        cache.put("Open", "values", [["a"]], ttl=0)
+        cache.put("Open", "worksheet", "handle", ttl=None)
+        self.assertIsNone(cache.get("Open", "values"))
+        self.assertEqual(cache.get("Open", "worksheet"), "handle")
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_lru_eviction(self):
+        cache = SheetCache(max_entries=2)
+        cache.put("Day1", "values", 1)
+        cache.put("Day2", "values", 2)
+        cache.get("Day1", "values")  # Day2 is now least recently used
+        cache.put("Day3", "values", 3)
+        self.assertIsNone(cache.get("Day2", "values"))
+        self.assertEqual(cache.get("Day1", "values"), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_invalidate_sheet_keeps_handles(self):
+        cache = SheetCache()
+        for kind in ["worksheet", "values", "table"]:
+            cache.put("Open", kind, kind)
+        cache.put("Mixed", "values", "values")
+        self.assertEqual(cache.invalidate("Open", keep=("worksheet",)), 2)
+        self.assertEqual(cache.get("Open", "worksheet"), "worksheet")
+        self.assertIsNone(cache.get("Open", "values"))
+        self.assertEqual(cache.get("Mixed", "values"), "values")
+
+    def test_stats(self):
+        cache = SheetCache()
+        cache.put("Open", "values", None)
+        self.assertIsNone(cache.get("Open", "values", MISSING))
+        self.assertIs(cache.get("Mixed", "values", MISSING), MISSING)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 1, 0.5))
+        self.assertIsNotNone(cache.age("Open", "values"))
+
+class TestManagerCache(unittest.TestCase):
+    def test_write_drops_division_values(self):
+        """After writing, the next read of the division sheet should come from the sheet, not the cache."""
+        manager = RelayManager()
+        manager.backend = MagicMock()
+        manager.cache.put("Open", "worksheet", manager.backend.worksheet.return_value, ttl=None)
+        manager.cache.put("Open", "values", [["Header"], ["", "1", "Team A", "1.0"]])
+        manager.cache.put("Day1", "values", [["Header"], ["Header"], day_row("1", ["0:30:00"])])
+
+        manager.update_division_times("Day1", "Open")
+        manager.backend.batch_write.assert_called_once()
+        self.assertIsNone(manager.cache.get("Open", "values"))
+        self.assertIsNotNone(manager.cache.get("Open", "worksheet"))
+        self.assertIsNotNone(manager.cache.get("Day1", "values"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from backend import LocalBackend
+from function import RelayManager
+from ingest import DayLog
+from synctest import day_row
+
+HEADERS = [["Header"], ["Header"]]
+
+class RenderingBackend(LocalBackend):
+    """LocalBackend that shows every formula cell as `rendered` unless read with FORMULA."""
+    rendered = "0:00:19"
+
+    def read_ranges(self, ranges, value_render_option='FORMATTED_VALUE'):
+        values = super().read_ranges(ranges, value_render_option)
+        if value_render_option == 'FORMULA':
+            return values
+        return [[[self.rendered if str(cell).startswith("=") else cell for cell in row] for row in grid]
+                for grid in values]
+
+class TestDayLog(unittest.TestCase):
+    def test_tail_appends_new_rows(self):
+        log = DayLog(team_col=2)
+        self.assertEqual(log.apply_full(HEADERS + [day_row("1", ["0:30:00"])]), {"1"})
+        self.assertEqual(log.high_water, 3)
+        self.assertEqual(log.apply_tail([day_row("1", ["0:30:00"]), day_row("2", ["0:40:00"])], 3), {"2"})
+        self.assertEqual(log.high_water, 4)
+
+    def test_tail_rejects_changed_overlap(self):
+        """If the last row read no longer matches, rows above it may have moved."""
+        log = DayLog(team_col=2)
+        log.apply_full(HEADERS + [day_row("1", ["0:30:00"])])
+        self.assertIsNone(log.apply_tail([day_row("9", ["0:30:00"])], 3))
+
+    def test_full_read_reports_only_changed_rows(self):
+        log = DayLog(team_col=2)
+        log.apply_full(HEADERS + [day_row("1", ["0:30:00"]), day_row("2", ["0:40:00"]), day_row("3", ["0:50:00"])])
+        changed = log.apply_full(HEADERS + [day_row("1", ["0:30:00"]), day_row("4", ["0:45:00"])])
+        self.assertEqual(changed, {"2", "3", "4"})
+
+class TestIncrementalSync(unittest.TestCase):
+    def setUp(self):
+        self.backend = LocalBackend()
+        self.day1 = HEADERS + [day_row("1", ["0:30:00"]), day_row("2", ["0:40:00"])]
+        self.backend.load_sheet("Day1", self.day1)
+        self.backend.load_sheet("Day2", HEADERS + [day_row("1", ["0:35:00"])])
+        self.backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.0"], ["", "2", "Team B", "1.0"], ["", "3", "Team C", "1.0"]])
+        self.manager = RelayManager(backend=self.backend)
+        self.manager.config["fullVerifyEvery"] = 2
+        self.manager.full_verify_every = 2
+        self.manager.update_all_divisions()
+
+    def read_ranges(self):
+        calls = []
+        original = self.backend.read_ranges
+        def record(ranges, value_render_option='FORMATTED_VALUE'):
+            calls.append(ranges)
+            return original(ranges, value_render_option)
+        self.backend.read_ranges = record
+        return calls
+
+    def test_only_new_rows_are_read_and_planned(self):
+        calls = self.read_ranges()
+        self.backend.load_sheet("Day1", self.day1 + [day_row("3", ["0:50:00"])])
+        self.manager.update_all_divisions()
+
+        self.assertEqual(len(calls), 1)
+        self.assertIn("'Day1'!A4:R", calls[0])
+        self.assertEqual(self.manager.dirty_teams["Day1"], {"3"})
+        # Matches still cover every team on the day sheet
+        self.assertEqual(self.manager.task_results[("Open", "Day1")]["attempts"], 3)
+        self.assertEqual(self.manager.task_results[("Open", "Day1")]["matches"], 3)
+        # Day2 totals include Day1, so team 3's change is carried forward
+        self.assertEqual(self.manager.dirty_teams["Day2"], {"3"})
+        self.assertEqual(self.backend.read_ranges(["'Open'!E4"])[0], [["0:50:00"]])
+
+    def test_edited_row_is_found_by_periodic_verify(self):
+        edited = HEADERS + [day_row("1", ["0:20:00"]), day_row("2", ["0:40:00"])]
+        self.backend.load_sheet("Day1", edited)
+        self.manager.update_all_divisions()  # Tail read: the edit above the high-water row isn't seen
+        self.assertEqual(self.manager.dirty_teams["Day1"], set())
+
+        self.manager.update_all_divisions()  # Full verify
+        self.assertIsNone(self.manager.dirty_teams["Day1"])
+        self.assertEqual(self.backend.read_ranges(["'Open'!E2"])[0], [["0:20:00"]])
+
+    def test_periodic_verify_restores_cleared_cells(self):
+        """A division cell cleared on the sheet is written again by the next full verify."""
+        self.backend.batch_write([{'range': "'Open'!E2", 'values': [[""]]}])
+        self.manager.update_all_divisions()  # Tail read: team 1 isn't replanned
+        self.assertEqual(self.backend.read_ranges(["'Open'!E2"])[0], [])
+
+        self.manager.update_all_divisions()  # Full verify
+        self.assertEqual(self.backend.read_ranges(["'Open'!E2"])[0], [["0:30:00"]])
+
+    def test_periodic_verify_restores_overwritten_cells(self):
+        """A value or formula overwritten on the sheet is written again by the next full verify."""
+        self.backend.batch_write([{'range': "'Open'!E2:F2", 'values': [["9:99:99", "junk"]]}])
+        self.manager.update_all_divisions()  # Tail read: team 1 isn't replanned
+        self.manager.update_all_divisions()  # Full verify
+        self.assertEqual(self.backend.read_ranges(["'Open'!E2:F2"])[0],
+                         [["0:30:00", '=TEXT((E2)/95.3, "hh:mm:ss")']])
+
+    def test_failed_sync_replans_rows_already_read(self):
+        """Rows read by a sync that then fails must still be written by the next one."""
+        self.backend.load_sheet("Day1", self.day1 + [day_row("3", ["0:50:00"])])
+        # Day2's last row changed, so it is re-read after Day1's tail was applied
+        self.backend.load_sheet("Day2", HEADERS + [day_row("1", ["0:36:00"])])
+        original = self.backend.read_ranges
+        reads = []
+        def fail_reread(ranges, value_render_option='FORMATTED_VALUE'):
+            reads.append(ranges)
+            if len(reads) == 2:
+                raise RuntimeError("backend unavailable")
+            return original(ranges, value_render_option)
+        self.backend.read_ranges = fail_reread
+        with self.assertRaises(RuntimeError):
+            self.manager.update_all_divisions()
+
+        self.backend.read_ranges = original
+        self.manager.update_all_divisions()
+        self.assertEqual(self.backend.read_ranges(["'Open'!E4"])[0], [["0:50:00"]])
+
+    def test_handicap_edit_replans_every_day(self):
+        self.backend.batch_write([{'range': "'Open'!D2", 'values': [["1.1"]]}])
+        self.manager.update_all_divisions()
+        self.assertEqual(self.manager.dirty_teams, {"Day1": {"1"}, "Day2": {"1"}, "Day3": {"1"}})
+
+if __name__ == "__main__":
+    unittest.main()
+
+class TestVerifyReadsFormulas(unittest.TestCase):
+    def setUp(self):
+        self.backend = RenderingBackend()
+        self.backend.load_sheet("Day1", HEADERS + [day_row("1", ["0:30:00"])])
+        self.backend.load_sheet("Day2", HEADERS)
+        self.backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.0"]])
+        self.manager = RelayManager(backend=self.backend)
+        self.manager.config["fullVerifyEvery"] = 2
+        self.manager.full_verify_every = 2
+        self.manager.update_all_divisions()
+
+    def test_formula_pasted_as_value_is_restored(self):
+        """A formula replaced by its own rendered value only shows up in a FORMULA read."""
+        self.backend.batch_write([{'range': "'Open'!F2", 'values': [[RenderingBackend.rendered]]}])
+        self.manager.update_all_divisions()  # Tail read: the rendered value looks unchanged
+        self.assertEqual(self.backend.read_ranges(["'Open'!F2"], 'FORMULA')[0], [[RenderingBackend.rendered]])
+
+        self.manager.update_all_divisions()  # Full verify
+        self.assertEqual(self.backend.read_ranges(["'Open'!F2"], 'FORMULA')[0], [['=TEXT((E2)/95.3, "hh:mm:ss")']])
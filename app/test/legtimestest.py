@@ -0,0 +1,93 @@
+import random
+import unittest
+import numpy as np
+from function import RelayManager
+from legtimes import format_hours, format_seconds, parse_leg_block, time_str_to_decimal
+from racetable import RaceTable
+
+SAMPLE_TIMES = ["0:30:00", "1:05:09", "12:00:01", "00:45:30", "", " ", "0:30", "abc", "1:2:3",
+                " 0:30:00", "0:30:00.6", "-0:10:00", "100:00:00", "1:75:00", "x:00:00", "nan:00:00"]
+FRACTIONAL_TIMES = ["0:30:00.6", "0:20:00.6", "0:00:59.5", "1:00:00.49", "0:0:0.5", "0:15:30.25", "0:30:00"]
+
+def random_rows(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        legs = [rng.choice(SAMPLE_TIMES) for _ in range(rng.randint(0, 13))]
+        rows.append(["ts", "email", str(i), "8:00:00", ""] + legs)
+    return rows
+
+def baseline_leg_times(values: list, timesheet: dict):
+    """Leg times as the original scalar path computed them: decimal hours per leg, summed."""
+    def to_decimal(time_str):
+        try:
+            if not time_str or not time_str.strip():
+                return None
+            parts = time_str.split(':')
+            if len(parts) != 3:
+                return None
+            return float(parts[0]) + (float(parts[1]) / 60) + (float(parts[2]) / 3600)
+        except:
+            return None
+
+    try:
+        start_idx = ord(timesheet["legBegin"]) - 65
+        end_idx = ord(timesheet["legEnd"]) - 65
+        times = [t for t in map(to_decimal, values[start_idx:end_idx + 1]) if t is not None]
+        if not times:
+            return None
+        total_time = sum(times)
+        hours = int(total_time)
+        minutes = int((total_time * 60) % 60)
+        seconds = int((total_time * 3600) % 60)
+        return {'elapsed': f"{hours}:{minutes:02d}:{seconds:02d}", 'decimal': total_time}
+    except Exception:
+        return None
+
+class TestBatchLegTimes(unittest.TestCase):
+    def setUp(self):
+        self.manager = RelayManager()
+        self.timesheet = self.manager.config["timesheet"]
+
+    def leg_times(self, rows: list) -> list:
+        """Leg times the sync writes for these response rows (every row has a team id)."""
+        table = RaceTable.from_day_values([["Header"], ["Header"]] + rows, self.manager.config)
+        return self.manager.table_leg_times(table)
+
+    def test_matches_baseline(self):
+        """Batch results must be identical to the original scalar path row by row."""
+        rows = random_rows(2000)
+        self.assertEqual(self.leg_times(rows), [baseline_leg_times(row, self.timesheet) for row in rows])
+
+    def test_matches_baseline_on_fractional_seconds(self):
+        """Fractional legs are summed, not rounded one by one, exactly as the original scalar path did."""
+        rows = random_rows(2000, seed=2)
+        rng = random.Random(2)
+        for row in rows:
+            row[5:] = [rng.choice(FRACTIONAL_TIMES + SAMPLE_TIMES) for _ in row[5:]]
+        rows.append(["ts", "email", "x", "8:00:00", "", "0:30:00.6", "0:20:00.6"])
+
+        leg_times = self.leg_times(rows)
+        self.assertEqual(leg_times, [baseline_leg_times(row, self.timesheet) for row in rows])
+        self.assertEqual(leg_times[-1]['elapsed'], "0:50:01")
+
+    def test_parse_block_mask(self):
+        """Blank and malformed cells should be masked out, not counted as zero."""
+        hours, valid = parse_leg_block([["0:30:00", "", "abc", "10:00:00"]], 0, 3)
+        self.assertEqual(hours.tolist(), [[0.5, 0, 0, 10.0]])
+        self.assertEqual(valid.tolist(), [[True, False, False, True]])
+
+    def test_format_seconds(self):
+        self.assertEqual(format_seconds(np.array([0, 3661, 45296])), ["0:00:00", "1:01:01", "12:34:56"])
+        self.assertEqual(format_seconds(np.array([47]), pad_hours=True), ["00:00:47"])
+        self.assertEqual(format_hours(np.array([2.7, 3001.2 / 3600])), ["2:42:00", "0:50:01"])
+
+    def test_elapsed_format_is_unchanged(self):
+        """Elapsed times are written as they always were; only values mode corrects the float error."""
+        total = sum(time_str_to_decimal(t) for t in ["1:31:46", "0:30:02", "1:45:54", "2:37:37"])
+        self.assertEqual(format_hours(np.array([total])), ["6:25:18"])
+        self.assertEqual(format_hours(np.array([total]), pad_hours=True), ["06:25:18"])
+        self.assertEqual(self.manager.decimal_to_time_str(total), "6:25:19")
+
+if __name__ == "__main__":
+    unittest.main()
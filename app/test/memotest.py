@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from function import RelayManager
+from memo import RowMemo, approx_size
+from synctest import day_row
+
+class TestRowMemo(unittest.TestCase):
+    def test_bounded_lru(self):
+        keys = [RowMemo.key("cells", "Day1", team) for team in "abc"]
+        entry = approx_size(keys[0]) + approx_size(1)
+        memo = RowMemo(max_bytes=2 * entry)
+        memo.put(keys[0], 1)
+        memo.put(keys[1], 2)
+        self.assertEqual(memo.get(keys[0]), 1)  # Now most recently used
+        memo.put(keys[2], 3)
+
+        self.assertIsNone(memo.get(keys[1]))
+        self.assertEqual(memo.get(keys[0]), 1)
+        self.assertEqual(len(memo), 2)
+        stats = memo.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 1, 1))
+        self.assertEqual(stats['bytes'], 2 * entry)
+
+    def test_bounded_by_size(self):
+        """One large row pushes out several small ones."""
+        small = [RowMemo.key("cells", "Day1", team) for team in "abc"]
+        memo = RowMemo(max_bytes=approx_size(small[0]) * 2 + approx_size(("x" * 1000,)))
+        for key in small:
+            memo.put(key, ("x",))
+        memo.put(RowMemo.key("cells", "Day1", "d"), ("x" * 1000,))
+        self.assertEqual(len(memo), 1)
+        self.assertLessEqual(memo.bytes, memo.max_bytes)
+
+    def test_key_depends_on_every_part(self):
+        self.assertEqual(RowMemo.key("a", 1, 1.2), RowMemo.key("a", "1", "1.2"))
+        self.assertNotEqual(RowMemo.key("ab", "c"), RowMemo.key("a", "bc"))
+
+class TestPlannedRowMemo(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.config_path = os.path.join(tmp, "columnValues.json")
+        shutil.copy("columnValues.json", self.config_path)
+
+        self.manager = RelayManager(config_path=self.config_path)
+        self.manager.backend = MagicMock()
+        self.division_values = [["Header"] * 28, ["", "1", "Team A", "1.2"] + [""] * 24]
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.cache.put("Mixed", "values", [["Header"]])
+        self.manager.cache.put("Day1", "values", [["Header"], ["Header"], day_row("1", ["0:30:00", "0:45:00"])])
+
+    def plan(self):
+        updates, _, _ = self.manager.plan_division_updates("Day1", "Open")
+        return updates
+
+    def test_unchanged_row_reuses_planned_cells(self):
+        first = self.plan()
+        second = self.plan()
+        self.assertEqual(first, second)
+        self.assertEqual(self.manager.row_memo.stats()['hits'], 1)
+
+    def test_changed_handicap_is_replanned(self):
+        self.plan()
+        # A fresh read, as prefetch_values stores it
+        self.manager.cache.put("Open", "values", [self.division_values[0], ["", "1", "Team A", "0.8"] + [""] * 24])
+        updates = {update['range']: update['values'][0][0] for update in self.plan()}
+        self.assertEqual(updates["G2"], "=E2*0.8")
+        self.assertEqual(self.manager.row_memo.stats()['hits'], 0)
+
+    def test_values_mode_is_not_memoized(self):
+        self.manager.write_mode = "values"
+        self.plan()
+        self.plan()
+        self.assertEqual(len(self.manager.row_memo), 0)
+
+    def test_config_change_clears_memo(self):
+        self.plan()
+        self.assertFalse(self.manager.reload_config_if_changed())
+
+        with open(self.config_path) as f:
+            config = json.load(f)
+        config["courseDistance"] = 42.2
+        with open(self.config_path, "w") as f:
+            json.dump(config, f)
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertTrue(self.manager.reload_config_if_changed())
+        self.assertEqual(len(self.manager.row_memo), 0)
+        self.assertEqual(self.manager.course_distance, 42.2)
+        self.assertTrue(self.manager._replan_all)
+        self.assertIsNone(self.manager.cache.get("Open", "values"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import urllib.error
+import urllib.request
+from backend import LocalBackend
+from function import RelayManager
+from metrics import REGISTRY, MetricsRegistry, start_http_server
+from synctest import day_row
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.inc("mor_cells_written_total", 3, sheet="Open")
+        registry.inc("mor_cells_written_total", 2, sheet="Open")
+        registry.set("mor_sheet_cache_hit_ratio", 0.5)
+        with registry.timer("mor_sync_phase_seconds", phase="fetch"):
+            pass
+        registry.inc("mor_sheets_api_requests_total", op='say "hi"')
+
+        text = registry.render()
+        self.assertIn("# TYPE mor_cells_written_total counter", text)
+        self.assertIn('mor_cells_written_total{sheet="Open"} 5', text)
+        self.assertIn("mor_sheet_cache_hit_ratio 0.5", text)
+        self.assertIn('mor_sync_phase_seconds_count{phase="fetch"} 1', text)
+        self.assertIn('op="say \\"hi\\""', text)
+
+    def test_http_server(self):
+        registry = MetricsRegistry()
+        registry.inc("mor_cells_written_total", 3, sheet="Open")
+        server = start_http_server(0, "127.0.0.1", registry)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        with urllib.request.urlopen(url + "/metrics") as response:
+            self.assertEqual(response.headers["Content-Type"], "text/plain; version=0.0.4")
+            self.assertIn('mor_cells_written_total{sheet="Open"} 3', response.read().decode())
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + "/other")
+
+class TestSyncInstrumentation(unittest.TestCase):
+    def setUp(self):
+        REGISTRY.clear()
+        self.addCleanup(REGISTRY.clear)
+
+    def test_sync_records_phases_and_api_calls(self):
+        backend = LocalBackend()
+        backend.load_sheet("Day1", [["Header"], ["Header"], day_row("1", ["0:30:00"])])
+        backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.0"]])
+        RelayManager(backend=backend).update_all_divisions()
+
+        self.assertEqual(REGISTRY.value("mor_sheets_api_requests_total", op="read"), 1)
+        self.assertEqual(REGISTRY.value("mor_sheets_api_requests_total", op="write"), 1)
+        self.assertEqual(REGISTRY.value("mor_sync_phase_seconds", phase="fetch"), 1)
+        self.assertEqual(REGISTRY.value("mor_sync_phase_seconds", phase="plan", division="Open", day="Day1"), 1)
+        self.assertEqual(REGISTRY.value("mor_sync_phase_seconds", phase="parse", sheet="Open"), 1)
+        self.assertEqual(REGISTRY.value("mor_cells_written_total", sheet="Open"), 4)
+        self.assertEqual(REGISTRY.value("mor_sync_seconds"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
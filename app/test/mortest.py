@@ -0,0 +1,44 @@
+import io
+import os
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+import mor
+
+def loaded_modules(code: str) -> set:
+    """Top-level modules loaded after running `code` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", code + "; import sys; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ).stdout
+    return {name.split(".")[0] for name in output.split()}
+
+class TestLazyImports(unittest.TestCase):
+    def test_cli_loads_no_heavy_modules(self):
+        modules = loaded_modules("import mor")
+        self.assertFalse(modules & {"flask", "numpy", "gspread", "apscheduler", "google"})
+
+    def test_server_skips_sync_dependencies(self):
+        modules = loaded_modules("import server")
+        self.assertIn("flask", modules)
+        self.assertFalse(modules & {"gspread", "apscheduler", "google", "function"})
+
+class TestCommands(unittest.TestCase):
+    def test_sync_dry_run_reports_startup(self):
+        output = io.StringIO()
+        with patch.dict(os.environ, {"SHEET_BACKEND": "local"}), redirect_stdout(output), \
+                patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            startup = mor.main(["sync", "--dry-run"])
+
+        self.assertIn("Nothing to write", output.getvalue())
+        self.assertIn("mor sync: ready in", stderr.getvalue())
+        self.assertGreaterEqual(startup.ready_seconds, startup.import_seconds)
+
+    def test_unknown_arguments_rejected(self):
+        with patch("sys.stderr", new_callable=io.StringIO), self.assertRaises(SystemExit):
+            mor.main(["serve", "--teams", "5"])
+
+if __name__ == "__main__":
+    unittest.main()
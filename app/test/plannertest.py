@@ -0,0 +1,69 @@
+import unittest
+from planner import WritePlan, chunk_updates, coalesce_updates
+
+def cell(cell_range: str, value: str) -> dict:
+    return {'range': cell_range, 'values': [[value]]}
+
+class TestCoalesceUpdates(unittest.TestCase):
+    def test_row_cells_merge_into_span(self):
+        """Adjacent result columns on one row should become a single range."""
+        merged = coalesce_updates([cell("E3", "a"), cell("F3", "b"), cell("G3", "c"), cell("H3", "d")])
+        self.assertEqual(merged, [{'range': "E3:H3", 'values': [["a", "b", "c", "d"]]}])
+
+    def test_consecutive_rows_merge_into_block(self):
+        """Matching spans on consecutive rows should become a rectangle."""
+        updates = []
+        for row in range(3, 6):
+            updates.extend([cell(f"K{row}", f"k{row}"), cell(f"L{row}", f"l{row}")])
+        merged = coalesce_updates(updates)
+        self.assertEqual(merged, [{
+            'range': "K3:L5",
+            'values': [["k3", "l3"], ["k4", "l4"], ["k5", "l5"]]
+        }])
+
+    def test_gaps_split_ranges(self):
+        """Skipped cells and rows must never be overwritten by a merged block."""
+        merged = coalesce_updates([cell("E3", "a"), cell("G3", "c"), cell("E5", "e"), cell("AA3", "z"), cell("AB3", "y")])
+        self.assertEqual([update['range'] for update in merged], ["E3", "G3", "AA3:AB3", "E5"])
+
+class TestChunkUpdates(unittest.TestCase):
+    def test_splits_on_payload_size(self):
+        """Batches should stay under the byte limit without dropping ranges."""
+        data = [cell(f"E{row}", "1:00:00") for row in range(10)]
+        batches = chunk_updates(data, max_bytes=100)
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(len(batch) for batch in batches), 10)
+
+class TestWritePlan(unittest.TestCase):
+    def setUp(self):
+        self.plan = WritePlan({
+            "Open": [cell(f"E{row}", "1:00:00") for row in range(3, 13)],
+            "Mixed": [cell("E3", "1:00:00"), cell("G3", "2:00:00")],
+            "Empty": []
+        }, max_bytes=100)
+
+    def test_cost(self):
+        """Cost should count merged ranges, cells, bytes and payload-sized requests."""
+        cost = self.plan.cost()
+        self.assertEqual(cost['ranges'], 3)
+        self.assertEqual(cost['cells'], 12)
+        self.assertEqual(cost['cells_by_sheet'], {"Open": 10, "Mixed": 2})
+        self.assertEqual(cost['requests'], len(self.plan.batches))
+        self.assertGreater(cost['requests'], 1)
+        self.assertEqual(cost['bytes'], sum(self.plan.batch_bytes))
+        self.assertEqual(cost['quota_wait_seconds'], 0)
+
+    def test_quota_wait(self):
+        """Requests beyond the tokens left should be costed at the quota's refill rate."""
+        cost = self.plan.cost(tokens_available=0, per_minute=60)
+        self.assertEqual(cost['quota_wait_seconds'], cost['requests'])
+        self.assertIn("Exceeds the write quota", self.plan.describe(tokens_available=0))
+
+    def test_empty_plan(self):
+        plan = WritePlan({"Open": []})
+        self.assertFalse(plan)
+        self.assertEqual(plan.cost()['requests'], 0)
+        self.assertTrue(plan.describe().endswith("Nothing to write"))
+
+if __name__ == "__main__":
+    unittest.main()
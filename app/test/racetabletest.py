@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from function import RelayManager
+from racetable import RaceTable
+
+class TestRaceTable(unittest.TestCase):
+    def setUp(self):
+        self.config = RelayManager().config
+
+    def test_division_table(self):
+        """Team ids map to sheet rows, parsed handicaps and result seconds."""
+        table = RaceTable.from_division_values([
+            ["Header"],
+            ["", "1", "Team A", "1.2", "1:30:00"],
+            ["", "", "", "", ""],
+            ["", "2", "Team B", "", ""],
+            ["", "3", "Team C", "invalid", "0:45:00"],
+        ], self.config)
+
+        self.assertEqual(table.team_ids, ["1", "2", "3"])
+        self.assertEqual(table.row_of("3"), 5)
+        self.assertEqual(table.handicap("1"), 1.2)
+        self.assertIsNone(table.handicap("2"))
+        self.assertIsNone(table.handicap("3"))
+        self.assertEqual(table.names, ["Team A", "Team B", "Team C"])
+        self.assertEqual(table.results["E"].tolist(), [5400, -1, 2700])
+        self.assertNotIn("4", table)
+
+    def test_day_table(self):
+        """Only rows with a team id are kept, with legs as a 2-D array of hours."""
+        table = RaceTable.from_day_values([
+            ["Header"],
+            ["Header"],
+            ["ts", "email", "7", "8:00:00", "", "0:30:00", "bad", "0:15:00"],
+            [],
+            ["ts", "email", "", "8:00:00", "", "0:30:00"],
+        ], self.config)
+
+        self.assertEqual(table.team_ids, ["7"])
+        self.assertEqual(table.row_numbers.tolist(), [3])
+        self.assertEqual(table.leg_hours.shape, (1, 13))
+        self.assertEqual(table.leg_hours.dtype, np.float64)
+        self.assertEqual(table.leg_hours[0, :3].tolist(), [0.5, 0, 0.25])
+        self.assertEqual(table.leg_valid[0, :3].tolist(), [True, False, True])
+
+if __name__ == "__main__":
+    unittest.main()
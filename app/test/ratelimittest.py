@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from ratelimit import RateLimiter, TokenBucket, is_quota_error
+
+class QuotaError(Exception):
+    code = 429
+
+class TestTokenBucket(unittest.TestCase):
+    def test_no_wait_under_capacity(self):
+        bucket = TokenBucket(5, period=60)
+        waits = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits, [0.0] * 5)
+        self.assertGreater(bucket.wait_time(), 0)
+
+    def test_waits_queue_in_order(self):
+        """Callers past the capacity wait one refill interval per queued request."""
+        bucket = TokenBucket(2, period=2)
+        bucket.reserve()
+        bucket.reserve()
+        self.assertAlmostEqual(bucket.reserve(), 1.0, places=1)
+        self.assertAlmostEqual(bucket.reserve(), 2.0, places=1)
+        self.assertLess(bucket.tokens, 0)
+
+    def test_thread_safe(self):
+        """Concurrent reservations must never hand out more tokens than exist."""
+        bucket = TokenBucket(100, period=3600)
+        free = []
+        def worker():
+            for _ in range(50):
+                if bucket.reserve() == 0:
+                    free.append(1)
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(free), 100)
+
+    def test_async_acquire(self):
+        bucket = TokenBucket(1, period=0.05)
+        async def run():
+            await bucket.acquire_async()
+            return await bucket.acquire_async()
+        self.assertGreater(asyncio.run(run()), 0)
+
+class TestRateLimiter(unittest.TestCase):
+    def test_read_and_write_buckets_are_separate(self):
+        limiter = RateLimiter(read_per_minute=1, write_per_minute=1)
+        self.assertEqual(limiter.wait_if_needed('read'), 0)
+        self.assertEqual(limiter.wait_if_needed('write'), 0)
+        self.assertGreater(limiter.stats()['read']['wait_seconds'], 0)
+
+    @patch("ratelimit.time.sleep")
+    def test_retries_quota_errors_with_backoff(self, sleep):
+        limiter = RateLimiter(base_delay=0.5)
+        func = MagicMock(side_effect=[QuotaError("Quota exceeded"), QuotaError("Quota exceeded"), "ok"])
+
+        self.assertEqual(limiter.call(func, kind='write'), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(limiter.throttled, 2)
+        self.assertGreater(limiter.stats()['write']['wait_seconds'], 0)
+
+    def test_other_errors_are_not_retried(self):
+        limiter = RateLimiter()
+        func = MagicMock(side_effect=ValueError("bad range"))
+        with self.assertRaises(ValueError):
+            limiter.call(func)
+        self.assertEqual(func.call_count, 1)
+
+    def test_is_quota_error(self):
+        self.assertTrue(is_quota_error(QuotaError()))
+        self.assertTrue(is_quota_error(Exception("RESOURCE_EXHAUSTED")))
+        self.assertFalse(is_quota_error(Exception("not found")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import server
+import snapshot
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        """Serve from a mocked backend with the background job disabled."""
+        self.backend = MagicMock()
+        self.backend.read_ranges.return_value = [
+            [
+                ["Header"],
+                ["Header"],
+                ["", "1", "Team A", "1.0", "2:00:00"],
+                ["", "2", "Team B", "1.0", "1:30:00"],
+            ],
+            [
+                ["Header"],
+                ["Header"],
+                ["", "10", "Team C", "1.0", "10:02:00"],
+                ["", "11", "Team D", "1.0", ""],
+                ["", "12", "Team E", "1.0", "9:58:00"],
+                ["", "13", "Team F", "1.0", "9:58:00"],
+            ],
+        ]
+        patcher = patch.object(server, "get_backend", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.patch_server(AUTO_UPDATE_ENABLED=False, SNAPSHOT_PATH="",
+                          snapshot=server.LeaderboardSnapshot(), broker=server.DeltaBroker())
+        self.client = server.app.test_client()
+
+    def patch_server(self, **values):
+        """Replace server globals for this test; the originals come back afterwards."""
+        for name, value in values.items():
+            patcher = patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+class TestLeaderboardSnapshot(ServerTestCase):
+    def test_requests_served_from_snapshot(self):
+        """Only the first request should reach the sheet."""
+        for _ in range(5):
+            response = self.client.get("/")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.backend.read_ranges.call_count, 1)
+        self.assertIn(b"Team B", response.data)
+        self.assertIn("X-Data-Age", response.headers)
+
+    def test_failed_refresh_keeps_last_snapshot(self):
+        """A sheet error should not wipe out data that was already served."""
+        server.refresh_snapshot()
+        self.backend.read_ranges.side_effect = Exception("quota exceeded")
+        server.refresh_snapshot()
+        rows, updated_at, version = server.snapshot.get()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(version, 1)
+        self.assertEqual(server.snapshot.last_error, "quota exceeded")
+
+class TestLeaderboardApi(ServerTestCase):
+    def test_sorts_numerically_past_blank_rows(self):
+        """9:58:00 beats 10:02:00, and a team without a time doesn't hide the rest."""
+        data = self.client.get("/api/leaderboard", query_string={"division": "Mixed", "day": "Day1"}).get_json()
+        self.assertEqual([e["team"] for e in data["entries"]], ["Team E", "Team F", "Team C"])
+        self.assertEqual([e["rank"] for e in data["entries"]], [1, 1, 3])
+        self.assertEqual(data["total"], 3)
+
+    def test_pagination(self):
+        query = {"division": "Mixed", "day": "Day1", "offset": 1, "limit": 2}
+        data = self.client.get("/api/leaderboard", query_string=query).get_json()
+        self.assertEqual([e["team"] for e in data["entries"]], ["Team F", "Team C"])
+        self.assertEqual([e["rank"] for e in data["entries"]], [1, 3])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get("/api/leaderboard?division=Nope").status_code, 404)
+        self.assertEqual(self.client.get("/api/leaderboard?ranking=fastest").status_code, 400)
+        self.assertEqual(self.client.get("/api/leaderboard?day=Day9").status_code, 400)
+        self.assertEqual(self.client.get("/api/leaderboard?limit=-1").status_code, 400)
+
+    def test_no_standings_yet(self):
+        """A failed first read is reported as unavailable, not as an unknown division."""
+        self.backend.read_ranges.side_effect = Exception("quota exceeded")
+        response = self.client.get("/api/leaderboard", query_string={"division": "Open"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()["last_error"], "quota exceeded")
+
+class TestConditionalResponses(ServerTestCase):
+    def test_not_modified(self):
+        """A client holding the current version's ETag or date gets an empty 304."""
+        for path in ["/", "/api/leaderboard?division=Mixed"]:
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            self.assertIn("Accept-Encoding", first.headers["Vary"])
+            self.assertIn("s-maxage", first.headers["Cache-Control"])
+
+            again = self.client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.data, b"")
+            since = self.client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+            self.assertEqual(since.status_code, 304)
+
+    def test_new_version_changes_etag(self):
+        etag = self.client.get("/").headers["ETag"]
+        self.backend.read_ranges.return_value[0][2][4] = "1:00:00"
+        server.refresh_snapshot()
+        response = self.client.get("/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_unchanged_standings_keep_etag(self):
+        """Refreshing, or another instance, with the same standings sends the same tag."""
+        for path in ["/", "/api/leaderboard?division=Mixed"]:
+            etag = self.client.get(path).headers["ETag"]
+            server.refresh_snapshot()
+            again = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+
+            server.snapshot = server.LeaderboardSnapshot()
+            with patch("time.time", return_value=1e9):
+                other = self.client.get(path)
+            self.assertEqual(other.headers["ETag"], etag)
+            self.assertEqual(other.headers["Last-Modified"], "Sun, 09 Sep 2001 01:46:40 GMT")
+
+    def test_gzip(self):
+        plain = self.client.get("/")
+        response = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertNotEqual(response.headers["ETag"], plain.headers["ETag"])
+
+class TestStream(ServerTestCase):
+    def test_stream_starts_with_snapshot(self):
+        with patch.object(server, "STREAM_MAX_SECONDS", 0):
+            response = self.client.get("/api/stream")
+            text = response.get_data(as_text=True)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertIn("event: snapshot", text)
+        self.assertIn("Team B", text)
+
+class TestScheduler(ServerTestCase):
+    def test_cold_start_reads_sheet_once(self):
+        """The first request refreshes inline, so the new background job waits an interval."""
+        self.patch_server(AUTO_UPDATE_ENABLED=True, _scheduler=None)
+        self.addCleanup(lambda: server._scheduler.shutdown(wait=False))
+
+        self.assertEqual(self.client.get("/").status_code, 200)
+        job, = server._scheduler.get_jobs()
+        self.assertGreater(job.next_run_time.timestamp(), server.snapshot.updated_at)
+        time.sleep(0.2)
+        self.assertEqual(self.backend.read_ranges.call_count, 1)
+
+class TestSavedSnapshot(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.patch_server(SNAPSHOT_PATH=os.path.join(tmp.name, "snapshot.npz"))
+
+    def restart(self):
+        """Simulate a cold start with the sheet unreachable."""
+        server.snapshot = server.LeaderboardSnapshot()
+        self.backend.read_ranges.reset_mock()
+        self.backend.read_ranges.side_effect = Exception("quota exceeded")
+        server.load_saved_snapshot()
+
+    def test_cold_start_serves_saved_snapshot(self):
+        server.refresh_snapshot()
+        saved = self.client.get("/api/leaderboard?division=Mixed&day=Day1").get_json()
+        self.restart()
+
+        response = self.client.get("/api/leaderboard?division=Mixed&day=Day1")
+        self.assertEqual(response.get_json()["entries"], saved["entries"])
+        self.assertEqual(self.client.get("/").status_code, 200)
+        self.backend.read_ranges.assert_not_called()
+
+    def test_stale_snapshot_still_served_when_sheet_fails(self):
+        server.refresh_snapshot()
+        self.restart()
+        with patch.object(server, "UPDATE_INTERVAL_MINUTES", 0):
+            response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Team B", response.data)
+
+    def test_other_format_is_ignored(self):
+        server.refresh_snapshot()
+        with patch.object(snapshot, "SNAPSHOT_FORMAT", 99):
+            self.restart()
+        self.assertTrue(server.snapshot.is_empty())
+
+class TestMetrics(ServerTestCase):
+    def test_metrics_endpoint(self):
+        self.client.get("/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        self.assertIn("mor_leaderboard_refresh_seconds_count", text)
+        self.assertIn("mor_leaderboard_snapshot_version 1", text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from settings import load_config
+
+class TestLoadConfig(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.write({"teamName": "c"})
+
+    def write(self, config: dict, mtime_ns: int = 1_000_000_000):
+        with open(self.path, "w") as f:
+            json.dump(config, f)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_parsed_once(self):
+        """Repeat loads of an unchanged file should reuse the parsed config."""
+        with patch("settings.json.load", wraps=json.load) as parse:
+            first = load_config(self.path)
+            second = load_config(self.path)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(first, {"teamName": "c"})
+
+        # Each caller gets its own copy
+        first["teamName"] = "x"
+        self.assertEqual(second["teamName"], "c")
+        self.assertEqual(load_config(self.path)["teamName"], "c")
+
+    def test_reloaded_when_file_changes(self):
+        load_config(self.path)
+        self.write({"teamName": "d"}, mtime_ns=2_000_000_000)
+        self.assertEqual(load_config(self.path), {"teamName": "d"})
+
+if __name__ == "__main__":
+    unittest.main()
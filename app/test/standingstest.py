@@ -0,0 +1,45 @@
+import json
+import unittest
+from racetable import RaceTable
+from standings import Standings
+
+with open("columnValues.json") as f:
+    CONFIG = json.load(f)
+
+def division_row(team_id, day1="", day2="", day2_total=""):
+    row = [""] * 28
+    row[1], row[2], row[3] = team_id, f"Team {team_id}", "1.0"
+    row[4], row[10], row[14] = day1, day2, day2_total
+    return row
+
+class TestStandings(unittest.TestCase):
+    def setUp(self):
+        values = [["Header"], ["Header"]] + [
+            division_row(str(team), day1=f"{team % 7 + 1}:00:{team % 3:02d}", day2_total=f"{team % 5 + 2}:00:00")
+            for team in range(1, 41)
+        ]
+        self.standings = Standings(RaceTable.from_division_values(values, CONFIG), CONFIG)
+
+    def test_heap_top_matches_full_sort(self):
+        """A top-K page taken with the heap should equal the same slice of the full sort."""
+        column = self.standings.column("Day1", "actual")
+        top = self.standings.page(column, 0, 5)
+        self.assertNotIn(column, self.standings._order)
+        self.assertEqual(top, self.standings.page(column, 0, None)[:5])
+        self.assertEqual(self.standings.page(column, 3, 4), self.standings.page(column, 0, None)[3:7])
+
+    def test_cumulative_ranking(self):
+        """Day1 has no running total, so cumulative falls back to the day's result."""
+        self.assertEqual(self.standings.column("Day1", "cumulative"), "E")
+        self.assertEqual(self.standings.column("Day2", "cumulative"), "O")
+        self.assertEqual(self.standings.latest_day("cumulative"), "Day2")
+        self.assertEqual(self.standings.latest_day("actual"), "Day1")
+
+    def test_ranks_are_consistent_across_pages(self):
+        column = self.standings.column("Day2", "cumulative")
+        full = self.standings.page(column)
+        for offset in range(len(full)):
+            self.assertEqual(self.standings.page(column, offset, 1)[0]["rank"], full[offset]["rank"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from racetable import RaceTable
+from standings import Standings
+from staticexport import export_static, write_if_changed
+from standingstest import CONFIG, division_row
+
+def build(open_day1: str):
+    """Open with one changeable Day1 time, Mixed with a fixed one."""
+    def standings(rows):
+        return Standings(RaceTable.from_division_values([["Header"], ["Header"]] + rows, CONFIG), CONFIG)
+    return {
+        "Open": standings([division_row("1", day1=open_day1), division_row("2", day1="1:30:00")]),
+        "Mixed": standings([division_row("3", day1="2:00:00")]),
+    }
+
+class TestStaticExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+
+    def read(self, name: str) -> str:
+        with open(os.path.join(self.dir, name)) as f:
+            return f.read()
+
+    def test_pages_per_division_day_and_ranking(self):
+        result = export_static(build("1:00:00"), 1000.0, self.dir)
+
+        # 2 divisions x 3 days x 2 rankings x (html + json), plus index.html/index.json/updated.json
+        self.assertEqual(result, {"written": 27, "unchanged": 0})
+        page = json.loads(self.read("open/day1/actual.json"))
+        self.assertEqual([entry["team"] for entry in page["entries"]], ["Team 1", "Team 2"])
+        self.assertEqual(page["total"], 2)
+        self.assertEqual(json.loads(self.read("updated.json")), {"updated_at": 1000.0})
+        self.assertEqual(len(json.loads(self.read("index.json"))["pages"]), 12)
+
+        html = self.read("mixed/day1/actual.html")
+        self.assertIn("Team 3", html)
+        self.assertIn('"/mixed/day1/actual.json"', html)
+        self.assertIn('href="/open/day1/actual.html"', html)
+        self.assertIn('href="/mixed/day1/handicap.html"', html)
+        self.assertNotIn("EventSource(", html)
+        self.assertEqual(self.read("index.html"), self.read("open/day1/actual.html"))
+
+    def test_only_changed_files_rewritten(self):
+        """A sync that changes nothing should only touch updated.json; a new time only its division's pages."""
+        export_static(build("1:00:00"), 1000.0, self.dir)
+        self.assertEqual(export_static(build("1:00:00"), 2000.0, self.dir), {"written": 1, "unchanged": 26})
+
+        before = os.stat(os.path.join(self.dir, "mixed/day1/actual.html")).st_mtime_ns
+        result = export_static(build("1:45:00"), 3000.0, self.dir)
+        # Open Day1 actual page and JSON, index.html (the same page) and updated.json
+        self.assertEqual(result["written"], 4)
+        self.assertEqual(os.stat(os.path.join(self.dir, "mixed/day1/actual.html")).st_mtime_ns, before)
+        page = json.loads(self.read("open/day1/actual.json"))
+        self.assertEqual([entry["team"] for entry in page["entries"]], ["Team 2", "Team 1"])
+
+    def test_write_if_changed_leaves_no_temp_files(self):
+        path = os.path.join(self.dir, "nested", "file.json")
+        self.assertTrue(write_if_changed(path, b"{}"))
+        self.assertFalse(write_if_changed(path, b"{}"))
+        self.assertTrue(write_if_changed(path, b"[]"))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["file.json"])
+
+if __name__ == "__main__":
+    unittest.main()
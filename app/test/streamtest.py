@@ -0,0 +1,58 @@
+import json
+import threading
+import unittest
+from stream import DeltaBroker
+
+def row(team_id, rank, seconds):
+    return {"rank": rank, "team_id": team_id, "team": f"Team {team_id}", "time": str(seconds), "seconds": seconds}
+
+def parse(text):
+    """(id, event, data) for each event in a chunk of stream text."""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+class TestDeltaBroker(unittest.TestCase):
+    def setUp(self):
+        self.broker = DeltaBroker(history=3)
+        self.broker.publish(1, [row("1", 1, 100), row("2", 2, 200), row("3", 3, 300)], 10.0)
+
+    def test_new_client_gets_snapshot(self):
+        texts, last_id = self.broker.wait(None, 0)
+        [(event_id, event, data)] = parse("".join(texts))
+        self.assertEqual((event_id, event, last_id), (1, "snapshot", 1))
+        self.assertEqual(len(data["rows"]), 3)
+
+    def test_delta_has_only_changes(self):
+        """Team 3 overtakes team 2; team 1 is untouched and team 2's row is re-ranked."""
+        delta = self.broker.publish(2, [row("1", 1, 100), row("3", 2, 150), row("2", 3, 200)], 11.0)
+        self.assertEqual({r["team_id"] for r in delta["rows"]}, {"2", "3"})
+        self.assertIn({"team_id": "3", "from": 3, "to": 2}, delta["moves"])
+        self.assertIsNone(self.broker.publish(3, [row("1", 1, 100), row("3", 2, 150), row("2", 3, 200)], 12.0))
+
+        texts, last_id = self.broker.wait(1, 0)
+        self.assertEqual([(i, e) for i, e, _ in parse("".join(texts))], [(2, "delta")])
+        self.assertEqual(last_id, 3)
+
+    def test_reconnect_too_far_behind_gets_snapshot(self):
+        for version in range(2, 7):
+            self.broker.publish(version, [row("1", 1, 100 + version)], float(version))
+        texts, _ = self.broker.wait(2, 0)
+        self.assertEqual(parse("".join(texts))[0][1], "snapshot")
+        texts, _ = self.broker.wait(4, 0)
+        self.assertEqual([(i, e) for i, e, _ in parse("".join(texts))], [(5, "delta"), (6, "delta")])
+        texts, _ = self.broker.wait(99, 0)  # Id from before a server restart
+        self.assertEqual(parse("".join(texts))[0][1], "snapshot")
+
+    def test_waiting_client_is_woken(self):
+        result = {}
+        waiter = threading.Thread(target=lambda: result.update(events=self.broker.wait(1, 5)))
+        waiter.start()
+        self.broker.publish(2, [row("1", 1, 90)], 11.0)
+        waiter.join(2)
+        self.assertEqual(result["events"][1], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from backend import LocalBackend
+from function import RelayManager
+from synctest import day_row
+from snapshot import load_snapshot
+from syncservice import SyncService, publish, save_standings
+
+class TestSyncService(unittest.TestCase):
+    def setUp(self):
+        self.backend = LocalBackend()
+        self.day1 = [["Header"], ["Header"], day_row("1", ["0:30:00"])]
+        self.backend.load_sheet("Day1", self.day1)
+        self.backend.load_sheet("Open", [["Header"], ["", "1", "Team A", "1.0"], ["", "2", "Team B", "1.0"]])
+        self.synced = []
+        self.service = SyncService(RelayManager(backend=self.backend), max_skips=2,
+                                   on_sync=lambda: self.synced.append(True))
+
+    def test_skips_when_probe_unchanged(self):
+        self.assertEqual(self.service.run_once()['outcome'], 'synced')
+        self.assertEqual(self.service.run_once()['outcome'], 'skipped')
+
+        self.backend.load_sheet("Day1", self.day1 + [day_row("2", ["0:40:00"])])
+        record = self.service.run_once()
+        self.assertEqual(record['outcome'], 'synced')
+        self.assertGreater(record['cells_written'], 0)
+        self.assertEqual(len(self.synced), 2)
+
+    def test_handicap_edit_is_a_change(self):
+        self.service.run_once()
+        self.backend.batch_write([{'range': "'Open'!D3", 'values': [["1.1"]]}])
+        self.assertEqual(self.service.run_once()['outcome'], 'synced')
+
+    def test_runs_anyway_after_max_skips(self):
+        """Edits to existing responses don't change the probe, so skipping is bounded."""
+        outcomes = [self.service.run_once()['outcome'] for _ in range(5)]
+        self.assertEqual(outcomes, ['synced', 'skipped', 'skipped', 'synced', 'skipped'])
+        self.assertEqual(len(self.service.history), 5)
+
+    def test_config_edit_is_a_change(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        config_path = os.path.join(tmp, "columnValues.json")
+        shutil.copy("columnValues.json", config_path)
+        self.service.manager = RelayManager(config_path=config_path, backend=self.backend)
+        self.assertEqual(self.service.run_once()['outcome'], 'synced')
+        self.assertEqual(self.service.run_once()['outcome'], 'skipped')
+
+        with open(config_path) as f:
+            config = json.load(f)
+        config["courseDistance"] = 42.2
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        stat = os.stat(config_path)
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(self.service.run_once()['outcome'], 'synced')
+        self.assertEqual(self.backend.read_ranges(["'Open'!F2"])[0], [['=TEXT((E2)/42.2, "hh:mm:ss")']])
+
+    def test_failure_is_recorded(self):
+        self.backend.quota_error_rate = 1.0
+        self.service.manager.rate_limiter.max_retries = 0
+        record = self.service.run_once()
+        self.assertEqual(record['outcome'], 'failed')
+        self.assertIn("Quota exceeded", record['error'])
+        self.assertEqual(self.synced, [])
+
+    def test_saved_standings_load_back(self):
+        """Standings skip the header rows, so rank team 2 on sheet row 3."""
+        self.backend.load_sheet("Day1", self.day1 + [day_row("2", ["0:40:00"])])
+        self.service.run_once()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snapshot.npz")
+            save_standings(self.service.manager, path)
+            standings, _ = load_snapshot(path, self.service.manager.config)
+        self.assertEqual([e["team"] for e in standings["Open"].page("E")], ["Team B"])
+
+    def test_publish_exports_static_site(self):
+        self.backend.load_sheet("Day1", self.day1 + [day_row("2", ["0:40:00"])])
+        self.service.run_once()
+        with tempfile.TemporaryDirectory() as tmp:
+            result = publish(self.service.manager, snapshot_path="", publish_dir=tmp)
+            with open(os.path.join(tmp, "open", "day1", "actual.json")) as f:
+                entries = json.load(f)["entries"]
+        self.assertEqual(result["unchanged"], 0)
+        self.assertEqual([e["team"] for e in entries], ["Team B"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+from unittest.mock import MagicMock
+from function import RelayManager
+
+def day_row(team_id: str, legs: list) -> list:
+    """Build a form response row with leg times starting at column F."""
+    return ["1/1/2025 10:00:00", "runner@example.com", team_id, "8:00:00", ""] + legs + [""] * (13 - len(legs))
+
+class TestIncrementalWrites(unittest.TestCase):
+    def setUp(self):
+        """Back the manager's cache with in-memory sheets."""
+        self.manager = RelayManager()
+        self.division_values = [
+            ["Header"] * 28,
+            ["", "1", "Team A", "1.2"] + [""] * 24,
+            ["", "2", "Team B", "0.9"] + [""] * 24,
+        ]
+        self.day_values = [
+            ["Header"] * 18,
+            ["Header"] * 18,
+            day_row("1", ["0:30:00", "0:45:00"]),
+            day_row("2", ["0:40:00", "0:50:00"]),
+        ]
+        self.manager.backend = MagicMock()
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.cache.put("Mixed", "values", [["Header"]])
+        self.manager.cache.put("Day1", "values", self.day_values)
+
+    def written_ranges(self):
+        call = self.manager.backend.batch_write.call_args
+        return [update["range"] for update in call[0][0]] if call else []
+
+    def test_second_run_skips_unchanged_cells(self):
+        """Nothing should be sent when the planned cells match the last run."""
+        self.manager.update_division_times("Day1", "Open")
+        self.assertEqual(self.written_ranges(), ["'Open'!E2:H3"])
+
+        # Simulate the sheet showing what we wrote on the next read
+        self.division_values[1][4] = "1:15:00"
+        self.division_values[2][4] = "1:30:00"
+        for row in self.division_values[1:]:
+            row[5:8] = ["0:00:47", "1:30:00", "0:00:57"]
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.backend.batch_write.reset_mock()
+
+        matches, attempts = self.manager.update_division_times("Day1", "Open")
+        self.assertEqual((matches, attempts), (2, 2))
+        self.manager.backend.batch_write.assert_not_called()
+        self.assertEqual(self.manager.write_stats[("Open", "Day1")], {'written': 0, 'skipped': 8})
+
+    def test_only_changed_team_is_written(self):
+        """A new leg time should only rewrite the affected team's actual time."""
+        self.manager.update_division_times("Day1", "Open")
+        self.division_values[1][4] = "1:15:00"
+        self.division_values[2][4] = "1:30:00"
+        for row in self.division_values[1:]:
+            row[5:8] = ["0:00:47", "1:30:00", "0:00:57"]
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.backend.batch_write.reset_mock()
+
+        # A fresh read replaces the cached values, as prefetch_values does
+        self.manager.cache.put("Day1", "values", self.day_values[:3] + [day_row("2", ["0:40:00", "0:50:00", "0:10:00"])])
+        self.manager.update_division_times("Day1", "Open")
+        self.assertEqual(self.written_ranges(), ["'Open'!E3"])
+
+    def test_edited_cells_are_corrected(self):
+        """A hand-edited value, or a formula now showing a different result, is written again."""
+        self.manager.update_division_times("Day1", "Open")
+        self.division_values[1][4] = "1:15:00"
+        self.division_values[2][4] = "1:30:00"
+        for row in self.division_values[1:]:
+            row[5:8] = ["0:00:47", "1:30:00", "0:00:57"]
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.update_division_times("Day1", "Open")  # First read since the write
+        self.manager.backend.batch_write.reset_mock()
+
+        self.division_values[1][4] = "9:99:99"
+        self.division_values[1][5] = "junk"
+        self.manager.cache.put("Open", "values", self.division_values)
+        self.manager.update_division_times("Day1", "Open")
+        self.assertEqual(self.written_ranges(), ["'Open'!E2:F2"])
+
+    def test_full_sync_sends_one_write(self):
+        """Every division/day pair should be written in a single batch request."""
+        self.manager.prefetch_values = MagicMock()
+        self.manager.cache.put("Mixed", "values", [["Header"], ["", "2", "Team B", "1.0"]])
+        for day in ["Day2", "Day3"]:
+            self.manager.cache.put(day, "values", self.day_values)
+
+        results = self.manager.update_all_divisions()
+
+        self.assertEqual(results["Open"]["Day3"], (2, 2))
+        self.assertEqual(results["Mixed"]["Day1"], (1, 2))
+        self.manager.backend.batch_write.assert_called_once()
+        sheets = {update.split("!")[0] for update in self.written_ranges()}
+        self.assertEqual(sheets, {"'Open'", "'Mixed'"})
+        self.assertIsNotNone(self.manager.last_sync_seconds)
+
+    def written_values(self):
+        call = self.manager.backend.batch_write.call_args
+        return {update["range"]: update["values"] for update in call[0][0]}
+
+    def test_computed_values_mode(self):
+        """Values mode should write plain times instead of formulas."""
+        self.manager.write_mode = "values"
+        self.manager.cache.put("Day2", "values", self.day_values)
+        self.manager.cache.put("Day1", "values", self.day_values[:2])  # No Day1 responses this sync
+        self.division_values[1][4] = "1:00:00"  # Day1 actual already on the sheet
+
+        self.manager.update_division_times("Day2", "Open")
+
+        written = self.written_values()
+        self.assertEqual(written["'Open'!K2:R3"][0], [
+            "1:15:00", "00:00:47", "1:30:00", "00:00:56",
+            "2:15:00", "0:00:42", "2:42:00", "00:01:41"
+        ])
+        for values in written.values():
+            for value in values[0]:
+                self.assertFalse(value.startswith("="))
+
+    def test_formula_mode_uses_course_distance(self):
+        """Formula mode should divide by the configured distance."""
+        self.manager.course_distance = 42.2
+        self.manager.update_division_times("Day1", "Open")
+        self.assertEqual(self.written_values()["'Open'!E2:H3"][0][1], '=TEXT((E2)/42.2, "hh:mm:ss")')
+
+    def test_concurrent_sync(self):
+        """Concurrent mode should plan and write every pair and collect errors per task."""
+        self.manager.prefetch_values = MagicMock()
+        self.manager.cache.put("Mixed", "values", [["Header"], ["", "2", "Team B", "1.0"]])
+        self.manager.cache.put("Day2", "values", self.day_values)
+        self.manager.cache.put("Day3", "values", None)  # Unreadable sheet
+
+        results = self.manager.update_all_divisions(max_workers=4)
+
+        self.assertEqual(list(results["Open"]), ["Day1", "Day2", "Day3"])
+        self.assertEqual(results["Open"]["Day2"], (2, 2))
+        self.assertEqual(results["Mixed"]["Day1"], (1, 2))
+        self.assertIsNotNone(self.manager.task_results[("Open", "Day3")]["error"])
+        self.assertIsNone(self.manager.task_results[("Mixed", "Day2")]["error"])
+        self.assertEqual(self.manager.backend.batch_write.call_count, 4)
+
+    def test_dry_run_plans_without_writing(self):
+        """plan_sync should cost out the whole sync, send nothing and leave it all to the next real sync."""
+        self.manager.prefetch_values = MagicMock()
+        self.manager.cache.put("Mixed", "values", [["Header"], ["", "2", "Team B", "1.0"]])
+
+        plan = self.manager.plan_sync()
+
+        self.manager.backend.batch_write.assert_not_called()
+        self.assertEqual(self.manager.last_written, {})
+        cost = plan.cost()
+        self.assertEqual(cost['requests'], 1)
+        self.assertEqual(cost['cells_by_sheet'], {"Open": 8, "Mixed": 4})
+        self.assertEqual(cost['ranges'], 2)
+        self.assertTrue(self.manager._replan_all)
+
+class TestBatchedRead(unittest.TestCase):
+    def test_prefetch_uses_one_request(self):
+        """All day and division sheets should come back from a single batch get."""
+        manager = RelayManager()
+        manager.backend = MagicMock()
+        manager.backend.read_ranges.return_value = [
+            [["Header"], ["Header"], day_row("1", ["0:30:00"])],
+            [],
+            [],
+            [["Header"], ["", "1", "Team A", "1.2"]],
+            [["Header"]],
+        ]
+
+        manager.prefetch_values()
+
+        manager.backend.read_ranges.assert_called_once()
+        ranges = manager.backend.read_ranges.call_args[0][0]
+        self.assertEqual(ranges, ["'Day1'!A:R", "'Day2'!A:R", "'Day3'!A:R", "'Open'!A:AB", "'Mixed'!A:AB"])
+        self.assertEqual(manager.get_cached_values("Day2"), [])
+        self.assertEqual(len(manager.get_cached_values("Open")[1]), 28)
+
+if __name__ == "__main__":
+    unittest.main()
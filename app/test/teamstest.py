@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import MagicMock
+from function import RelayManager
+from racetable import RaceTable
+from synctest import day_row
+from teams import TeamRegistry, build_registry
+
+class TestTeamRegistry(unittest.TestCase):
+    def setUp(self):
+        self.config = RelayManager().config
+        self.tables = {
+            "Open": RaceTable.from_division_values([
+                ["Header"],
+                ["", "1", "Team A", "1.2"],
+                ["", "2", "Team B", ""],
+                ["", "1", "Team A again", "1.1"],
+            ], self.config),
+            "Mixed": RaceTable.from_division_values([
+                ["Header"],
+                ["", "3", "Team C", "0.9"],
+                ["", "2", "Team B", "1.0"],
+            ], self.config),
+        }
+
+    def test_lookup(self):
+        """Entries carry division, row and parsed handicap; the last duplicate row wins."""
+        with self.assertLogs("teams", level="WARNING"):
+            registry = TeamRegistry(self.tables)
+        self.assertEqual(registry.lookup("1"), ("Open", 4, 2, 1.1, False))
+        self.assertEqual(registry.lookup("3").division, "Mixed")
+        self.assertEqual(registry.lookup("2", "Mixed").handicap, 1.0)
+        self.assertEqual(registry.lookup("2", "Open").handicap, 1.0)
+        self.assertTrue(registry.lookup("2", "Open").handicap_missing)
+        self.assertIsNone(registry.lookup("3", "Open"))
+        self.assertEqual(len(registry), 3)
+
+    def test_flags_duplicates_and_missing_handicaps(self):
+        with self.assertLogs("teams", level="WARNING") as logs:
+            registry = TeamRegistry(self.tables)
+        self.assertEqual(registry.duplicates, {
+            "1": [("Open", 2), ("Open", 4)],
+            "2": [("Open", 3), ("Mixed", 3)],
+        })
+        self.assertEqual(registry.missing_handicaps, {"2"})
+        self.assertEqual(len(logs.output), 3)
+
+    def test_unknown_teams_logged_once_per_day_table(self):
+        with self.assertLogs("teams", level="WARNING"):
+            registry = TeamRegistry(self.tables)
+        day_table = RaceTable.from_day_values(
+            [["Header"], ["Header"], day_row("1", ["0:30:00"]), day_row("9", ["0:30:00"])], self.config
+        )
+        with self.assertLogs("teams", level="WARNING") as logs:
+            self.assertEqual(registry.unknown("Day1", day_table), {"9"})
+            self.assertEqual(registry.unknown("Day1", day_table), {"9"})
+        self.assertEqual(len(logs.output), 1)
+
+    def test_build_registry_reuses_same_tables(self):
+        with self.assertLogs("teams", level="WARNING"):
+            registry = build_registry(self.tables)
+        self.assertIs(build_registry(dict(self.tables), registry), registry)
+        changed = dict(self.tables, Mixed=RaceTable.from_division_values([["Header"]], self.config))
+        with self.assertLogs("teams", level="WARNING"):
+            self.assertIsNot(build_registry(changed, registry), registry)
+
+class TestSharedRegistry(unittest.TestCase):
+    def test_missing_handicap_warned_once_per_sync(self):
+        """Planning all three days should validate the division teams only once."""
+        manager = RelayManager()
+        manager.backend = MagicMock()
+        manager.prefetch_values = MagicMock()
+        manager.cache.put("Open", "values", [["Header"], ["", "1", "Team A", ""]])
+        manager.cache.put("Mixed", "values", [["Header"]])
+        for day in manager.days:
+            manager.cache.put(day, "values", [["Header"], ["Header"], day_row("1", ["0:30:00"])])
+
+        with self.assertLogs("teams", level="WARNING") as logs:
+            results = manager.update_all_divisions()
+
+        self.assertEqual(results["Open"]["Day3"], (1, 1))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("No valid handicap factor for teams 1", logs.output[0])
+
+if __name__ == "__main__":
+    unittest.main()